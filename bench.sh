@@ -0,0 +1,6 @@
+set -e
+base_tree=$(mktemp -d)
+git worktree add --detach "$base_tree" "${1:?usage: bench.sh BASE_REVISION}" >/dev/null
+trap 'git worktree remove --force "$base_tree"' EXIT
+BENCH_SRC="$base_tree/src" python3 benchmarks/bench.py save --baseline "$base_tree/baseline.json"
+python3 benchmarks/bench.py compare --baseline "$base_tree/baseline.json"
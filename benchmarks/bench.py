@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.environ.get('BENCH_SRC') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import main as site  # noqa: E402
+from block_cache import BlockCache  # noqa: E402
+from corpus import add_options, generate_corpus, options_from_args  # noqa: E402
+from manifest import Manifest  # noqa: E402
+from markdown_blocks import block_to_block_type, markdown_to_blocks, markdown_to_html_node  # noqa: E402
+from template import Template  # noqa: E402
+from textnode import text_to_textnodes  # noqa: E402
+
+BENCH_VERSION = 2
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'template.html')
+
+
+def best_of(fn, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def calibration_loop():
+    counts = {}
+    for i in range(20000):
+        word = f'word{i % 500}'
+        counts[word] = counts.get(word, 0) + len(word.upper())
+    return ' '.join(sorted(counts))
+
+
+def stage_benchmarks(markdowns, template_text):
+    documents = [markdown_to_blocks(markdown) for markdown in markdowns]
+    blocks = [block for document in documents for block in document]
+    paragraphs = [block for block in blocks if block_to_block_type(block) == 'paragraph']
+    nodes = [markdown_to_html_node(markdown) for markdown in markdowns]
+    bodies = [node.to_html() for node in nodes]
+    template = Template(template_text)
+    return {
+        'markdown_to_blocks': lambda: [markdown_to_blocks(markdown) for markdown in markdowns],
+        'block_to_block_type': lambda: [block_to_block_type(block) for block in blocks],
+        'text_to_textnodes': lambda: [text_to_textnodes(paragraph) for paragraph in paragraphs],
+        'markdown_to_html_node': lambda: [markdown_to_html_node(markdown) for markdown in markdowns],
+        'to_html': lambda: [node.to_html() for node in nodes],
+        'template': lambda: [template.render({'Title': 'Title', 'Content': body}) for body in bodies],
+    }
+
+
+def build(content, public, manifest, incremental):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = site.build_pages(content, TEMPLATE_PATH, public, manifest, incremental=incremental)
+    if result.errors:
+        raise RuntimeError(f'Benchmark build failed: {result.errors[0]}')
+
+
+def build_benchmarks(root):
+    content = os.path.join(root, 'content')
+    public = os.path.join(root, 'public')
+
+    def full_build():
+        site.blocks = BlockCache()
+        build(content, public, Manifest(), False)
+
+    manifest = Manifest()
+    build(content, public, manifest, False)
+    return {
+        'build': full_build,
+        'build_noop': lambda: build(content, public, manifest, True),
+    }
+
+
+def measure(benchmarks, repeat):
+    calibration = best_of(calibration_loop, repeat)
+    stages = {name: best_of(fn, repeat) for name, fn in benchmarks.items()}
+    return stages, min(calibration, best_of(calibration_loop, repeat))
+
+
+def run(options, repeat):
+    root = tempfile.mkdtemp()
+    try:
+        paths = generate_corpus(os.path.join(root, 'content'), options)
+        markdowns = []
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                markdowns.append(f.read())
+        with open(TEMPLATE_PATH, encoding='utf-8') as f:
+            template_text = f.read()
+        benchmarks = stage_benchmarks(markdowns, template_text)
+        benchmarks.update(build_benchmarks(root))
+        stages, calibration = measure(benchmarks, repeat)
+    finally:
+        shutil.rmtree(root)
+    return {
+        'version': BENCH_VERSION,
+        'python': platform.python_version(),
+        'calibration': calibration,
+        'corpus': vars(options),
+        'bytes': sum(len(markdown.encode('utf-8')) for markdown in markdowns),
+        'stages': stages,
+    }
+
+
+def compare(baseline, current, threshold):
+    scale = current['calibration'] / baseline['calibration']
+    lines = [
+        f'Baseline scaled by {scale:.2f}x from the calibration loop',
+        f'{"stage":<24} {"baseline ms":>12} {"current ms":>12} {"change":>8}',
+    ]
+    regressions = []
+    for name, seconds in current['stages'].items():
+        before = baseline['stages'].get(name)
+        if before is None:
+            lines.append(f'{name:<24} {"-":>12} {seconds * 1000:>12.2f} {"new":>8}')
+            continue
+        before *= scale
+        change = seconds / before - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        lines.append(f'{name:<24} {before * 1000:>12.2f} {seconds * 1000:>12.2f} {change:>+8.1%}{flag}')
+    return '\n'.join(lines), regressions
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != BENCH_VERSION:
+        raise ValueError(f'Unsupported baseline version in {path}')
+    return data
+
+
+def save_results(path, results):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark each pipeline stage and a full build on a synthetic corpus.',
+        epilog='bench.sh BASE_REVISION saves a baseline from BASE_REVISION and compares the working tree against it.',
+    )
+    parser.add_argument('command', choices=['run', 'save', 'compare'], nargs='?', default='run')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file to save to or compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown per stage (default: 0.2)')
+    parser.add_argument('--repeat', type=int, default=5)
+    add_options(parser)
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline) if args.command == 'compare' else None
+    options = options_from_args(args)
+    if baseline is not None and baseline['corpus'] != vars(options):
+        options.__dict__.update(baseline['corpus'])
+        print('Using the corpus options stored in the baseline')
+
+    results = run(options, args.repeat)
+    if args.command == 'save':
+        save_results(args.baseline, results)
+        print(f'Saved baseline to {args.baseline}')
+    if baseline is None:
+        for name, seconds in results['stages'].items():
+            print(f'{name:<24} {seconds * 1000:>10.2f} ms')
+        return
+
+    report, regressions = compare(baseline, results, args.threshold)
+    print(report)
+    if regressions:
+        print(f'{len(regressions)} stages regressed by more than {args.threshold:.0%}: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from textnode import (  # noqa: E402
+    TextNode,
+    split_nodes_delimiter,
+    text_to_textnodes,
+    text_type_bold,
+    text_type_code,
+    text_type_image,
+    text_type_italic,
+    text_type_link,
+    text_type_text,
+)
+
+
+def split_nodes_pattern(old_nodes, pattern, opener, text_type):
+    new = []
+    for node in old_nodes:
+        if node.text_type != text_type_text:
+            new.append(node)
+            continue
+        matches = re.findall(pattern, node.text)
+        if not len(matches):
+            new.append(node)
+            continue
+        to_split = node.text
+        splitted_nodes = []
+        for i in matches:
+            splitted = to_split.split(f'{opener}{i[0]}]({i[1]})', 1)
+            if splitted[0]:
+                splitted_nodes.append(TextNode(splitted[0], text_type_text))
+            splitted_nodes.append(TextNode(i[0], text_type, i[1]))
+            to_split = splitted[1]
+        if to_split:
+            splitted_nodes.append(TextNode(to_split, text_type_text))
+        new.extend(splitted_nodes)
+    return new
+
+
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, r'!\[(.*?)\]\((.*?)\)', '![', text_type_image)
+
+
+def split_nodes_link(old_nodes):
+    return split_nodes_pattern(old_nodes, r'(?<!!)\[(.*?)\]\((.*?)\)', '[', text_type_link)
+
+
+def chained_text_to_textnodes(text):
+    bold = split_nodes_delimiter([TextNode(text, text_type_text)], '**', text_type_bold)
+    italic = split_nodes_delimiter(bold, '*', text_type_italic)
+    code = split_nodes_delimiter(italic, '`', text_type_code)
+    image = split_nodes_image(code)
+    return split_nodes_link(image)
+
+
+def link_dense_paragraph(links):
+    parts = ['A **long** paragraph with *many* `links`:']
+    for i in range(links):
+        parts.append(f'see [page {i}](/pages/{i}) and ![figure {i}](/images/{i}.png)')
+    return ' '.join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the single-pass inline tokenizer with the chained split passes.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000], help='links per paragraph')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f'{"links":>8} {"chained ms":>12} {"single ms":>12} {"speedup":>8}')
+    for size in args.sizes:
+        text = link_dense_paragraph(size)
+        assert chained_text_to_textnodes(text) == text_to_textnodes(text)
+        number = max(1, 2000 // size)
+        chained = min(timeit.repeat(lambda: chained_text_to_textnodes(text), number=number, repeat=args.repeat)) / number
+        single = min(timeit.repeat(lambda: text_to_textnodes(text), number=number, repeat=args.repeat)) / number
+        print(f'{size:>8} {chained * 1000:>12.3f} {single * 1000:>12.3f} {chained / single:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from markdown_blocks import parse_document, read_blocks, write_blocks  # noqa: E402
+from textnode import text_to_textnodes  # noqa: E402
+
+words = ['middle', 'earth', 'ring', 'elves', 'dwarves', 'hobbit', 'wizard', 'river', 'mountain', 'forest']
+
+
+def sample_markdown(size, seed=0):
+    rng = random.Random(seed)
+    blocks = []
+    length = 0
+    while length < size:
+        sentence = ' '.join(rng.choice(words) for _ in range(12))
+        block = (
+            f'Some **{sentence[:20]}** and *{sentence[20:40]}* with `code` and a [link](/{rng.randrange(100)}) '
+            f'and ![img](/img/{rng.randrange(100)}.png) {sentence}'
+        )
+        if rng.random() < 0.2:
+            block = f'## Heading {len(blocks)}'
+        elif rng.random() < 0.2:
+            block = '\n'.join(f'* item with **bold** {sentence[:30]}' for _ in range(5))
+        blocks.append(block)
+        length += len(block) + 2
+    return '# Title\n\n' + '\n\n'.join(blocks)
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Peak traced memory per MB of markdown.')
+    parser.add_argument('--size', type=int, default=1 << 20, help='bytes of markdown (default: 1 MB)')
+    args = parser.parse_args(argv)
+
+    markdown = sample_markdown(args.size)
+    megabytes = len(markdown.encode('utf-8')) / (1 << 20)
+    paragraph = ' '.join(b for b in markdown.split('\n\n') if b.startswith('Some'))
+
+    nodes, peak, elapsed = measure(lambda: text_to_textnodes(paragraph))
+    print(f'text_to_textnodes: {len(nodes)} nodes, peak {peak / (1 << 20) / megabytes:.1f} MB per MB, {elapsed * 1000:.0f} ms')
+    document, peak, elapsed = measure(lambda: parse_document(markdown))
+    print(f'parse_document:    peak {peak / (1 << 20) / megabytes:.1f} MB per MB, {elapsed * 1000:.0f} ms')
+    _, peak, elapsed = measure(lambda: document.node.to_html())
+    print(f'to_html:           peak {peak / (1 << 20) / megabytes:.1f} MB per MB, {elapsed * 1000:.0f} ms')
+
+    with tempfile.NamedTemporaryFile('w', suffix='.md', encoding='utf-8', delete=False) as f:
+        f.write(markdown)
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as out:
+            _, peak, elapsed = measure(lambda: write_blocks(read_blocks(f.name), out.write))
+        print(f'streamed file:     peak {peak / (1 << 20):.1f} MB total, {elapsed * 1000:.0f} ms')
+    finally:
+        os.remove(f.name)
+
+
+if __name__ == '__main__':
+    main()
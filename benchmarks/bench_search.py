@@ -0,0 +1,86 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from search_index import PAGES_NAME, SearchIndex, SearchReader  # noqa: E402
+
+
+def vocabulary(size, seed):
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return sorted({''.join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(size)})
+
+
+def zipf_weights(size):
+    return list(itertools.accumulate(1 / (rank + 1) for rank in range(size)))
+
+
+def page_text(rng, words, weights, length):
+    return ' '.join(rng.choices(words, cum_weights=weights, k=length))
+
+
+def directory_size(directory):
+    sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+    return sum(sizes.values()), max(size for name, size in sizes.items() if name != PAGES_NAME), sizes[PAGES_NAME]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build a search index over synthetic pages and time queries against it.')
+    parser.add_argument('--pages', type=int, default=100000)
+    parser.add_argument('--words', type=int, default=200, help='words per page')
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    words = vocabulary(args.vocabulary, args.seed)
+    weights = zipf_weights(len(words))
+    index = SearchIndex()
+    start = time.perf_counter()
+    for i in range(args.pages):
+        index.update(f'page-{i}.md', f'/page-{i}.html', f'Page {i}', page_text(rng, words, weights, args.words))
+    indexed = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, 'search')
+        start = time.perf_counter()
+        shards = index.write(directory)
+        written = time.perf_counter() - start
+        total, largest, pages = directory_size(directory)
+        print(f'{args.pages} pages, {len(index.postings)} terms: index {indexed:.2f} s, write {written:.2f} s')
+        print(
+            f'{shards} shards, {total / 1e6:.1f} MB total, largest shard {largest / 1e3:.0f} kB, '
+            f'{PAGES_NAME} {pages / 1e3:.0f} kB'
+        )
+
+        index.update('page-0.md', '/page-0.html', 'Page 0', page_text(rng, words, weights, args.words))
+        start = time.perf_counter()
+        shards = index.write(directory)
+        print(f'incremental update: {shards} shards rewritten in {(time.perf_counter() - start) * 1000:.0f} ms')
+
+        queries = [' '.join(rng.sample(words[:2000], 2)) for _ in range(args.queries)]
+        reader = SearchReader(directory)
+        start = time.perf_counter()
+        for query in queries:
+            reader = SearchReader(directory)
+            reader.query(query)
+        cold = (time.perf_counter() - start) / len(queries)
+        reader = SearchReader(directory)
+        for query in queries:
+            reader.query(query)
+        start = time.perf_counter()
+        for query in queries:
+            reader.query(query)
+        warm = (time.perf_counter() - start) / len(queries)
+        print(f'query latency: cold {cold * 1000:.2f} ms, warm {warm * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
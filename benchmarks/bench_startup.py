@@ -0,0 +1,105 @@
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_PATH)
+
+from corpus import add_options, generate_corpus, options_from_args  # noqa: E402
+from daemon import send_request  # noqa: E402
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'template.html')
+MAIN_PATH = os.path.abspath(os.path.join(SRC_PATH, 'main.py'))
+CLIENT_PATH = os.path.abspath(os.path.join(SRC_PATH, 'daemon.py'))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_process(args, root):
+    subprocess.run([sys.executable, *args], cwd=root, check=True, stdout=subprocess.DEVNULL)
+
+
+def daemon_build(address):
+    response = send_request(address, {'command': 'build', 'argv': ['--incremental']})
+    if not response['ok']:
+        raise RuntimeError(f'Daemon build failed: {response.get("error") or response["errors"]}')
+
+
+def wait_for_daemon(address, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return send_request(address, {'command': 'ping'}, timeout=1)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def run(options, repeat):
+    root = tempfile.mkdtemp()
+    try:
+        paths = generate_corpus(os.path.join(root, 'content'), options)
+        shutil.copy(TEMPLATE_PATH, os.path.join(root, 'template.html'))
+        os.makedirs(os.path.join(root, 'static'))
+        page = paths[len(paths) // 2]
+
+        def edit():
+            with open(page, 'a', encoding='utf-8') as f:
+                f.write('\n\nEdited paragraph.')
+
+        run_process([MAIN_PATH], root)
+        import_code = f'import sys; sys.path.insert(0, {SRC_PATH!r}); import main'
+        timings = {
+            'import': [timed(lambda: run_process(['-c', import_code], root)) for _ in range(repeat)],
+            'cold_noop': [timed(lambda: run_process([MAIN_PATH, '--incremental'], root)) for _ in range(repeat)],
+            'cold_edit': [],
+        }
+        for _ in range(repeat):
+            edit()
+            timings['cold_edit'].append(timed(lambda: run_process([MAIN_PATH, '--incremental'], root)))
+
+        address = os.path.join(root, '.build-cache', 'daemon.sock')
+        server = subprocess.Popen([sys.executable, MAIN_PATH, 'daemon'], cwd=root, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_daemon(address)
+            daemon_build(address)
+            timings['daemon_noop'] = [timed(lambda: daemon_build(address)) for _ in range(repeat)]
+            timings['daemon_edit'] = []
+            for _ in range(repeat):
+                edit()
+                timings['daemon_edit'].append(timed(lambda: daemon_build(address)))
+            timings['client_noop'] = [
+                timed(lambda: run_process([CLIENT_PATH, '--incremental'], root)) for _ in range(repeat)
+            ]
+        finally:
+            send_request(address, {'command': 'shutdown'}, timeout=5)
+            server.wait(timeout=30)
+    finally:
+        shutil.rmtree(root)
+    return {name: statistics.median(values) for name, values in timings.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare one-shot CLI builds with builds sent to a warm daemon on a synthetic corpus.'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    add_options(parser)
+    args = parser.parse_args(argv)
+    results = run(options_from_args(args), args.repeat)
+    for name, seconds in results.items():
+        print(f'{name:<16} {seconds * 1000:>10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import random
+
+words = (
+    'middle earth ring elves dwarves hobbit wizard river mountain forest shire road tower '
+    'king sword council fellowship shadow light ancient song journey'
+).split()
+
+
+class CorpusOptions:
+    def __init__(
+        self,
+        pages=100,
+        paragraph_words=60,
+        paragraphs=6,
+        list_items=5,
+        link_density=0.05,
+        nesting=3,
+        seed=0,
+    ) -> None:
+        self.pages = pages
+        self.paragraph_words = paragraph_words
+        self.paragraphs = paragraphs
+        self.list_items = list_items
+        self.link_density = link_density
+        self.nesting = nesting
+        self.seed = seed
+
+
+def inline_text(rng, count, link_density, page_count):
+    parts = []
+    for _ in range(count):
+        word = rng.choice(words)
+        roll = rng.random()
+        if roll < link_density:
+            parts.append(f'[{word}](/section-{rng.randrange(page_count)}/)')
+        elif roll < link_density * 1.2:
+            parts.append(f'![{word}](/images/{word}.png)')
+        elif roll < 0.08:
+            parts.append(f'**{word}**')
+        elif roll < 0.12:
+            parts.append(f'*{word}*')
+        elif roll < 0.14:
+            parts.append(f'`{word}`')
+        else:
+            parts.append(word)
+    return ' '.join(parts)
+
+
+def page_markdown(rng, options, index):
+    blocks = [f'# Page {index} {rng.choice(words)}']
+    for i in range(options.paragraphs):
+        blocks.append(inline_text(rng, options.paragraph_words, options.link_density, options.pages))
+        if i % 3 == 1:
+            blocks.append(f'## Section {i}')
+        if i % 3 == 2 and options.list_items:
+            items = [inline_text(rng, 8, options.link_density, options.pages) for _ in range(options.list_items)]
+            if rng.random() < 0.5:
+                blocks.append('\n'.join(f'* {item}' for item in items))
+            else:
+                blocks.append('\n'.join(f'{n}. {item}' for n, item in enumerate(items, 1)))
+        if i == 0:
+            blocks.append(f'> {inline_text(rng, 12, 0, options.pages)}')
+            blocks.append('```\nprint("hello")\nreturn 42\n```')
+    return '\n\n'.join(blocks) + '\n'
+
+
+def page_path(rng, options, index):
+    depth = rng.randint(0, options.nesting)
+    parts = [f'section-{rng.randrange(max(1, options.pages // 10))}' for _ in range(depth)]
+    return os.path.join(*parts, f'page-{index}.md') if parts else f'page-{index}.md'
+
+
+def generate_corpus(root, options):
+    rng = random.Random(options.seed)
+    paths = []
+    for index in range(options.pages):
+        path = os.path.join(root, page_path(rng, options, index))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(page_markdown(rng, options, index))
+        paths.append(path)
+    return paths
+
+
+def add_options(parser):
+    defaults = CorpusOptions()
+    parser.add_argument('--pages', type=int, default=defaults.pages)
+    parser.add_argument('--paragraph-words', type=int, default=defaults.paragraph_words)
+    parser.add_argument('--paragraphs', type=int, default=defaults.paragraphs)
+    parser.add_argument('--list-items', type=int, default=defaults.list_items)
+    parser.add_argument('--link-density', type=float, default=defaults.link_density)
+    parser.add_argument('--nesting', type=int, default=defaults.nesting)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def options_from_args(args):
+    return CorpusOptions(
+        args.pages, args.paragraph_words, args.paragraphs, args.list_items, args.link_density, args.nesting, args.seed
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a seeded synthetic markdown content tree.')
+    parser.add_argument('root', help='directory to write the markdown pages into')
+    add_options(parser)
+    args = parser.parse_args(argv)
+    paths = generate_corpus(args.root, options_from_args(args))
+    print(f'Wrote {len(paths)} pages to {args.root}')
+
+
+if __name__ == '__main__':
+    main()
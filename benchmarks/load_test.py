@@ -0,0 +1,111 @@
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fileserver import FileCache, StaticRequestHandler, start_file_server  # noqa: E402
+
+
+def site_paths(root):
+    paths = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(('.gz', '.br')):
+                continue
+            rel = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')
+            paths.append('/' + rel.removesuffix('index.html'))
+    return sorted(paths)
+
+
+def worker(host, port, paths, headers, deadline, latencies, errors):
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 400:
+            errors.append(path)
+    connection.close()
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the static file server with keep-alive GET requests.')
+    parser.add_argument('--root', default='public', help='site to serve in-process and request paths from')
+    parser.add_argument('--url', help='test an already running server instead of starting one')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds to run (default: 5)')
+    parser.add_argument('--accept-encoding', default='gzip, br')
+    parser.add_argument('--revalidate', action='store_true', help='send If-None-Match to exercise 304 responses')
+    args = parser.parse_args(argv)
+
+    paths = site_paths(args.root)
+    if not paths:
+        parser.error(f'No files under {args.root}; build the site first')
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        StaticRequestHandler.log_message = lambda *args: None
+        server = start_file_server(args.root, 0, FileCache())
+        host, port = '127.0.0.1', server.server_address[1]
+
+    headers = {'Accept-Encoding': args.accept_encoding}
+    if args.revalidate:
+        connection = http.client.HTTPConnection(host, port, timeout=10)
+        connection.request('GET', paths[0], headers=headers)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        headers['If-None-Match'] = response.getheader('ETag', '')
+        paths = paths[:1]
+
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(host, port, paths, headers, deadline, latencies, errors))
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+
+    latencies.sort()
+    print(f'{len(latencies)} requests in {elapsed:.1f} s ({len(latencies) / elapsed:.0f} req/s), {len(errors)} errors')
+    if latencies:
+        print(
+            f'latency p50 {percentile(latencies, 0.5) * 1000:.2f} ms, '
+            f'p99 {percentile(latencies, 0.99) * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms'
+        )
+    if server is not None:
+        print(server.RequestHandlerClass.keywords['cache'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+python3 src/main.py --incremental serve --watch
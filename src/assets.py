@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from fileutils import make_dirs, remove_output
+from manifest import hash_file
+from static_sync import walk_files
+
+ASSET_INDEX_VERSION = 1
+fingerprint_suffixes = (
+    '.css', '.js', '.mjs', '.svg', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.woff', '.woff2', '.ttf', '.otf'
+)
+image_suffixes = ('.svg', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif')
+reference_pattern = re.compile(r'(\s(?:href|src)=)(["\']?)(/[^"\'\s>?#]+)')
+fingerprinted_pattern = re.compile(r'\.[0-9a-f]{10}\.\w+$')
+
+
+def fingerprint_name(rel, digest):
+    base, suffix = os.path.splitext(rel)
+    return f'{base}.{digest[:10]}{suffix}'
+
+
+class AssetResult:
+    def __init__(self) -> None:
+        self.written = []
+        self.hashed = 0
+        self.removed = []
+
+    def __repr__(self) -> str:
+        return f'AssetResult({len(self.written)} written, {self.hashed} hashed, {len(self.removed)} removed)'
+
+
+class AssetFingerprints:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.entries = {}
+        self.urls = {}
+        self.sources = {}
+        self.digest = ''
+
+    def load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == ASSET_INDEX_VERSION:
+            self.entries = data['entries']
+
+    def save(self, path):
+        make_dirs(os.path.dirname(path))
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': ASSET_INDEX_VERSION, 'entries': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def process(self, static_path, public_path):
+        result = AssetResult()
+        entries = {}
+        urls = {}
+        sources = {}
+        for path, stat in walk_files(static_path):
+            rel = os.path.relpath(path, static_path).replace(os.sep, '/')
+            if not rel.lower().endswith(fingerprint_suffixes) or fingerprinted_pattern.search(rel):
+                continue
+            entry = self.entries.get(rel)
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                digest = hash_file(path)
+                entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'name': fingerprint_name(rel, digest)}
+                result.hashed += 1
+            dest = os.path.join(public_path, entry['name'])
+            if not os.path.exists(dest):
+                make_dirs(os.path.dirname(dest))
+                shutil.copy2(path, f'{dest}.tmp')
+                os.replace(f'{dest}.tmp', dest)
+                result.written.append(entry['name'])
+            entries[rel] = entry
+            urls[f'/{rel}'] = f'/{entry["name"]}'
+            sources[f'/{rel}'] = sources[f'/{entry["name"]}'] = os.path.normpath(path)
+
+        live = {entry['name'] for entry in entries.values()}
+        for rel, entry in sorted(self.entries.items()):
+            if entry['name'] not in live:
+                remove_output(os.path.join(public_path, entry['name']), public_path)
+                result.removed.append(entry['name'])
+        self.entries = entries
+        self.urls = urls
+        self.sources = sources
+        self.digest = hashlib.blake2b(repr(sorted(urls.items())).encode('utf-8'), digest_size=16).hexdigest()
+        return result
+
+    def rewrite(self, text, inputs=None):
+        def replace(match):
+            url = match[3]
+            fingerprinted = self.urls.get(url)
+            if fingerprinted is None:
+                return match[0]
+            if inputs is not None:
+                inputs.append(self.sources[url])
+            return f'{match[1]}{match[2]}{fingerprinted}'
+
+        return reference_pattern.sub(replace, text)
+
+    def image_props(self, props):
+        fingerprinted = {url: dict(extra) for url, extra in props.items()}
+        for url, target in self.urls.items():
+            if url.lower().endswith(image_suffixes):
+                fingerprinted.setdefault(url, {})['src'] = target
+        for extra in fingerprinted.values():
+            if 'srcset' in extra:
+                candidates = [candidate.split(' ', 1) for candidate in extra['srcset'].split(', ')]
+                extra['srcset'] = ', '.join(f'{self.urls.get(url, url)} {width}' for url, width in candidates)
+        return fingerprinted
+
+    def inputs(self, links):
+        return [self.sources[url] for tag, url in links if tag == 'img' and url in self.sources]
+
+    def __repr__(self) -> str:
+        return f'AssetFingerprints({len(self.urls)} assets)'
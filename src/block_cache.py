@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+BLOCK_CACHE_VERSION = 3
+
+
+def block_key(block, variant=''):
+    return hashlib.blake2b(block.encode('utf-8'), digest_size=16, key=variant.encode('utf-8')).hexdigest()
+
+
+class BlockCache:
+    def __init__(self, max_entries=10000) -> None:
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.new_entries = None
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, block, variant=''):
+        key = block_key(block, variant)
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return key, None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return key, value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self.dirty = True
+        if self.new_entries is not None:
+            self.new_entries[key] = value
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def update(self, entries):
+        for key, value in entries.items():
+            self.put(key, value)
+
+    def track_new_entries(self):
+        self.new_entries = {}
+
+    def take_new_entries(self):
+        entries = self.new_entries
+        self.new_entries = None
+        return entries
+
+    def load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != BLOCK_CACHE_VERSION:
+            return
+        self.entries = OrderedDict(list(data['entries'].items())[-self.max_entries :])
+        self.dirty = False
+
+    def save(self, path):
+        if not self.dirty and os.path.exists(path):
+            return
+        dest_dir = os.path.dirname(path)
+        if dest_dir != '':
+            os.makedirs(dest_dir, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': BLOCK_CACHE_VERSION, 'entries': self.entries}, f)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f'BlockCache({len(self.entries)} entries, {self.hits} hits, {self.misses} misses)'
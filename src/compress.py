@@ -0,0 +1,83 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fileutils import remove_output
+from static_sync import walk_files
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+compressible_suffixes = ('.html', '.css', '.js', '.mjs', '.json', '.xml', '.svg', '.txt', '.md', '.map')
+
+
+def compress_encodings():
+    return ('.gz', '.br') if brotli is not None else ('.gz',)
+
+
+class CompressResult:
+    def __init__(self) -> None:
+        self.compressed = []
+        self.skipped = 0
+        self.removed = []
+
+    def __repr__(self) -> str:
+        return f'CompressResult({len(self.compressed)} compressed, {self.skipped} skipped, {len(self.removed)} removed)'
+
+
+def compress_site(root, manifest, jobs=1, encodings=None):
+    encodings = encodings or compress_encodings()
+    result = CompressResult()
+    files = {path: stat for path, stat in walk_files(root)}
+    written = {os.path.join(root, rel) for rel in manifest.compressed}
+    siblings = []
+    pending = []
+    for path, stat in sorted(files.items()):
+        base, suffix = os.path.splitext(path)
+        if path in written:
+            if base not in files or suffix not in encodings:
+                remove_output(path, root)
+                result.removed.append(path)
+            continue
+        if not is_compressible(path):
+            continue
+        for encoding in encodings:
+            siblings.append(path + encoding)
+            compressed = files.get(path + encoding)
+            if compressed is not None and compressed.st_mtime_ns == stat.st_mtime_ns:
+                result.skipped += 1
+            else:
+                pending.append((path, encoding))
+
+    if jobs <= 1 or len(pending) <= 1:
+        for task in pending:
+            compress_file(task)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(compress_file, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+    result.compressed = [path + encoding for path, encoding in pending]
+    manifest.compressed = [os.path.relpath(path, root).replace(os.sep, '/') for path in siblings]
+    return result
+
+
+def is_compressible(path):
+    return path.endswith(compressible_suffixes)
+
+
+def compress_file(task):
+    path, encoding = task
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if encoding == '.br':
+        data = brotli.compress(data, quality=11)
+    else:
+        data = gzip.compress(data, compresslevel=9, mtime=0)
+    dest = path + encoding
+    tmp_path = f'{dest}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, dest)
@@ -0,0 +1,96 @@
+import os
+
+
+class BuildConfig:
+    def __init__(
+        self,
+        root='.',
+        content_path=None,
+        static_path=None,
+        template_path=None,
+        public_path=None,
+        cache_path=None,
+        incremental=False,
+        jobs=1,
+        static_mode='copy',
+        static_check='mtime',
+        explain=False,
+        compress=False,
+        minify=False,
+        search=False,
+        images=False,
+        fingerprint=False,
+        site_url=None,
+        backlinks=False,
+        io_threads=0,
+        profile=None,
+        profile_top=10,
+        block_cache=True,
+    ) -> None:
+        self.root = root
+        self.content_path = content_path or os.path.join(root, 'content')
+        self.static_path = static_path or os.path.join(root, 'static')
+        self.template_path = template_path or os.path.join(root, 'template.html')
+        self.public_path = public_path or os.path.join(root, 'public')
+        self.cache_path = cache_path or os.path.join(root, '.build-cache')
+        self.incremental = incremental
+        self.jobs = jobs
+        self.static_mode = static_mode
+        self.static_check = static_check
+        self.explain = explain
+        self.compress = compress
+        self.minify = minify
+        self.search = search
+        self.images = images
+        self.fingerprint = fingerprint
+        self.site_url = site_url
+        self.backlinks = backlinks
+        self.io_threads = io_threads
+        self.profile = profile
+        self.profile_top = profile_top
+        self.block_cache = block_cache
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.cache_path, 'manifest.json')
+
+    @property
+    def block_cache_path(self):
+        return os.path.join(self.cache_path, 'blocks.json')
+
+    @property
+    def profile_path(self):
+        return os.path.join(self.cache_path, 'profile.json')
+
+    @property
+    def image_cache_path(self):
+        return os.path.join(self.cache_path, 'images')
+
+    @property
+    def image_index_path(self):
+        return os.path.join(self.cache_path, 'images.json')
+
+    @property
+    def asset_index_path(self):
+        return os.path.join(self.cache_path, 'assets.json')
+
+    @property
+    def daemon_socket_path(self):
+        return os.path.join(self.cache_path, 'daemon.sock')
+
+    @property
+    def search_path(self):
+        return os.path.join(self.public_path, 'search')
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        unknown = set(data) - set(vars(cls()))
+        if unknown:
+            raise ValueError(f'Unknown build options: {", ".join(sorted(unknown))}')
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return f'BuildConfig({self.root}, incremental={self.incremental}, jobs={self.jobs})'
@@ -0,0 +1,197 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+
+from config import BuildConfig
+from fileutils import make_dirs
+
+volatile_options = ('incremental', 'jobs', 'explain', 'io_threads', 'profile', 'profile_top')
+path_options = ('root', 'content_path', 'static_path', 'template_path', 'public_path', 'cache_path', 'profile')
+
+
+class BuildDaemon:
+    def __init__(self, build, parse_config, root='.') -> None:
+        self.build = build
+        self.parse_config = parse_config
+        self.root = os.path.abspath(root)
+        self.manifest = None
+        self.state = None
+        self.builds = 0
+        self.running = True
+
+    def handle(self, request):
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': 'Requests must be JSON objects'}
+        command = request.get('command', 'build')
+        if command == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'builds': self.builds}
+        if command == 'shutdown':
+            self.running = False
+            return {'ok': True}
+        if command != 'build':
+            return {'ok': False, 'error': f'Unknown command: {command}'}
+
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                config = self.request_config(request)
+                manifest, result = self.build(config, self.warm_manifest(config))
+        except SystemExit:
+            return {'ok': False, 'error': 'Invalid build arguments', 'output': output.getvalue()}
+        except Exception as e:
+            self.manifest = self.state = None
+            return {'ok': False, 'error': f'{type(e).__name__}: {e}', 'output': output.getvalue()}
+        self.builds += 1
+        self.manifest = manifest
+        self.state = self.state_key(config)
+        return {
+            'ok': not result.errors,
+            'rendered': result.rendered,
+            'skipped': result.skipped,
+            'removed': len(result.removed),
+            'errors': [f'{path}: {error}' for path, error in result.errors],
+            'seconds': time.perf_counter() - start,
+            'output': output.getvalue(),
+        }
+
+    def request_config(self, request):
+        if 'argv' in request:
+            args, config = self.parse_config(request['argv'])
+            if args.command is not None:
+                raise ValueError(f'{args.command} cannot run inside the daemon')
+        else:
+            config = BuildConfig.from_dict(request.get('config', {}))
+        for name in path_options:
+            if getattr(config, name) is None:
+                continue
+            path = os.path.abspath(getattr(config, name))
+            if path != self.root and not path.startswith(self.root + os.sep):
+                raise ValueError(f'{name} must be inside {self.root}')
+        return config
+
+    def state_key(self, config):
+        options = {name: value for name, value in config.to_dict().items() if name not in volatile_options}
+        try:
+            mtime = os.stat(config.manifest_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        return options, mtime
+
+    def warm_manifest(self, config):
+        if self.manifest is not None and config.incremental and self.state == self.state_key(config):
+            return self.manifest
+        return None
+
+    def __repr__(self) -> str:
+        return f'BuildDaemon({self.root}, {self.builds} builds, warm={self.manifest is not None})'
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {'ok': False, 'error': 'Invalid JSON request'}
+            else:
+                response = self.server.build_daemon.handle(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            if not self.server.build_daemon.running:
+                break
+
+
+class DaemonTCPServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def start_daemon_server(address, build_daemon):
+    if isinstance(address, tuple):
+        server = DaemonTCPServer(address, DaemonRequestHandler)
+    else:
+        make_dirs(os.path.dirname(address))
+        if os.path.exists(address):
+            try:
+                send_request(address, {'command': 'ping'}, timeout=1)
+            except OSError:
+                os.remove(address)
+            else:
+                raise RuntimeError(f'A build daemon is already listening on {address}')
+        umask = os.umask(0o177)
+        try:
+            server = socketserver.UnixStreamServer(address, DaemonRequestHandler)
+        finally:
+            os.umask(umask)
+    server.build_daemon = build_daemon
+    return server
+
+
+def serve_daemon(address, build_daemon):
+    server = start_daemon_server(address, build_daemon)
+    print(f'Build daemon for {build_daemon.root} listening on {address}')
+    try:
+        while build_daemon.running:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if not isinstance(address, tuple) and os.path.exists(address):
+            os.remove(address)
+
+
+def send_request(address, request, timeout=None):
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    with socket.socket(family, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(address)
+        connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with connection.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError('The build daemon closed the connection')
+    return json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Send a build request to a running build daemon.',
+        epilog='Any other arguments are passed to the build as they would be to main.py.',
+    )
+    parser.add_argument('--socket', default=BuildConfig().daemon_socket_path, metavar='PATH')
+    parser.add_argument('--port', type=int, metavar='N', help='connect to 127.0.0.1:N instead of a Unix socket')
+    parser.add_argument('--ping', action='store_true', help='check that the daemon is running')
+    parser.add_argument('--shutdown', action='store_true', help='stop the daemon')
+    args, build_argv = parser.parse_known_args(argv)
+    address = args.socket if args.port is None else ('127.0.0.1', args.port)
+    if args.ping:
+        request = {'command': 'ping'}
+    elif args.shutdown:
+        request = {'command': 'shutdown'}
+    else:
+        request = {'command': 'build', 'argv': build_argv}
+    try:
+        response = send_request(address, request)
+    except OSError as e:
+        print(f'Could not reach the build daemon on {address}: {e}', file=sys.stderr)
+        sys.exit(2)
+    sys.stdout.write(response.get('output', ''))
+    if 'error' in response:
+        print(response['error'], file=sys.stderr)
+    elif args.ping:
+        print(f'Build daemon {response["pid"]} is running ({response["builds"]} builds)')
+    elif 'seconds' in response:
+        print(f'Built in {response["seconds"] * 1000:.1f} ms by the daemon')
+    if not response['ok']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+class DependencyGraph:
+    def __init__(self, inputs=None) -> None:
+        self.inputs = inputs if inputs is not None else {}
+        self.dependents = {}
+        for page, page_inputs in self.inputs.items():
+            for path in page_inputs:
+                self.dependents.setdefault(path, set()).add(page)
+
+    def record(self, page, inputs):
+        self.remove(page)
+        self.inputs[page] = dict(inputs)
+        for path in inputs:
+            self.dependents.setdefault(path, set()).add(page)
+
+    def remove(self, page):
+        for path in self.inputs.pop(page, {}):
+            pages = self.dependents[path]
+            pages.discard(page)
+            if not pages:
+                del self.dependents[path]
+
+    def affected(self, paths):
+        rebuild = {}
+        for path in sorted(set(paths)):
+            for page in sorted(self.dependents.get(path, ())):
+                rebuild.setdefault(page, []).append(path)
+        return rebuild
+
+    def changed_inputs(self, page, hash_of):
+        return [path for path, digest in sorted(self.inputs.get(page, {}).items()) if hash_of(path) != digest]
+
+    def __repr__(self) -> str:
+        return f'DependencyGraph({len(self.inputs)} pages, {len(self.dependents)} inputs)'
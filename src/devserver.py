@@ -0,0 +1,120 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+livereload_path = '/__livereload'
+livereload_script = (
+    f"<script>new EventSource('{livereload_path}').onmessage = () => location.reload();</script>"
+)
+
+
+def inject_livereload(html):
+    index = html.rfind('</body>')
+    if index == -1:
+        return html + livereload_script
+    return html[:index] + livereload_script + html[index:]
+
+
+class Watcher:
+    def __init__(self, paths) -> None:
+        self.paths = paths
+        self.state = self.snapshot()
+
+    def snapshot(self):
+        state = {}
+        stack = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                stack.append(path)
+            elif os.path.exists(path):
+                stat = os.stat(path)
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    else:
+                        stat = entry.stat()
+                        state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def poll(self):
+        state = self.snapshot()
+        changed = sorted(path for path, key in state.items() if self.state.get(path) != key)
+        removed = sorted(set(self.state) - set(state))
+        self.state = state
+        return changed, removed
+
+
+class LiveReload:
+    def __init__(self) -> None:
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, livereload=None, **kwargs) -> None:
+        self.livereload = livereload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == livereload_path:
+            self.send_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split('?', 1)[0].endswith('/'):
+            path = os.path.join(path, 'index.html')
+        if not path.endswith('.html') or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, encoding='utf-8') as f:
+            body = inject_livereload(f.read()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        generation = self.livereload.generation
+        try:
+            while True:
+                current = self.livereload.wait(generation, timeout=15)
+                if current != generation:
+                    self.wfile.write(b'data: reload\n\n')
+                    generation = current
+                else:
+                    self.wfile.write(b': ping\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if self.path != livereload_path:
+            super().log_message(format, *args)
+
+
+def start_server(directory, port, livereload):
+    handler = partial(DevRequestHandler, directory=directory, livereload=livereload)
+    server = ThreadingHTTPServer(('', port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
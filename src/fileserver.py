@@ -0,0 +1,211 @@
+import mimetypes
+import os
+import posixpath
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from assets import fingerprinted_pattern
+
+encodings = (('br', '.br'), ('gzip', '.gz'))
+
+
+class FileCache:
+    def __init__(self, max_bytes=64 << 20, max_file_size=1 << 20) -> None:
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, stat):
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.put(path, key, body)
+        return body
+
+    def put(self, path, key, body):
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self.entries[path] = (key, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f'FileCache({len(self.entries)} files, {self.size} bytes, {self.hits} hits, {self.misses} misses)'
+
+
+def make_etag(stat, encoding=None):
+    tag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def cache_control(path):
+    if path.endswith('.html'):
+        return 'no-cache'
+    if fingerprinted_pattern.search(path):
+        return 'public, max-age=31536000, immutable'
+    return 'public, max-age=3600'
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        name, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def content_type(path):
+    kind, _ = mimetypes.guess_type(path)
+    if kind is None:
+        return 'application/octet-stream'
+    if kind.startswith('text/') or kind in ('application/javascript', 'application/json', 'image/svg+xml'):
+        return f'{kind}; charset=utf-8'
+    return kind
+
+
+class StaticRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'StaticSite'
+    disable_nagle_algorithm = True
+
+    def __init__(self, *args, directory=None, cache=None, **kwargs) -> None:
+        self.directory = os.path.abspath(directory)
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        self.send_file(head=False)
+
+    def do_HEAD(self):
+        self.send_file(head=True)
+
+    def send_file(self, head):
+        url_path = urlsplit(self.path).path
+        path = self.translate_path(url_path)
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        if os.path.isdir(path):
+            if not url_path.endswith('/'):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header('Location', url_path + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            path = os.path.join(path, 'index.html')
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        encoding, served_path, served_stat = self.negotiate(path, stat)
+        etag = make_etag(stat, encoding)
+        headers = [
+            ('ETag', etag),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+            ('Cache-Control', cache_control(path)),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if self.not_modified(etag, stat):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        body = None
+        length = served_stat.st_size
+        if length <= self.cache.max_file_size:
+            body = self.cache.get(served_path, served_stat)
+            length = len(body)
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type(path))
+        self.send_header('Content-Length', str(length))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if head:
+            return
+        if body is not None:
+            self.wfile.write(body)
+        else:
+            with open(served_path, 'rb') as f:
+                self.connection.sendfile(f, count=length)
+
+    def negotiate(self, path, stat):
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding', ''))
+        for encoding, suffix in encodings:
+            if encoding not in accepted and '*' not in accepted:
+                continue
+            try:
+                variant = os.stat(path + suffix)
+            except OSError:
+                continue
+            if variant.st_mtime_ns == stat.st_mtime_ns:
+                return encoding, path + suffix, variant
+        return None, path, stat
+
+    def not_modified(self, etag, stat):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None:
+            return False
+        try:
+            return int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def translate_path(self, url_path):
+        path = posixpath.normpath(unquote(url_path))
+        parts = [part for part in path.split('/') if part and part not in ('.', '..')]
+        resolved = os.path.join(self.directory, *parts)
+        if resolved != self.directory and not resolved.startswith(self.directory + os.sep):
+            return None
+        return resolved
+
+
+def start_file_server(directory, port, cache=None):
+    handler = partial(StaticRequestHandler, directory=directory, cache=cache if cache is not None else FileCache())
+    server = ThreadingHTTPServer(('', port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,51 @@
+import os
+
+
+def remove_tree(path):
+    dirs = []
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    os.remove(entry.path)
+    for current in reversed(dirs):
+        os.rmdir(current)
+
+
+def make_dirs(path):
+    missing = []
+    while path != '' and not os.path.isdir(path):
+        missing.append(path)
+        path = os.path.dirname(path)
+    for path in reversed(missing):
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            pass
+
+
+def remove_output(output, dest_dir_path):
+    if os.path.exists(output):
+        os.remove(output)
+    root = os.path.abspath(dest_dir_path)
+    parent = os.path.dirname(os.path.abspath(output))
+    while parent != root and parent.startswith(root) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+
+def write_atomic(path, write):
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            write(f)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
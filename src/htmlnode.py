@@ -1,52 +1,86 @@
+import re
+
+unquoted_value_pattern = re.compile(r'[^\s"\'=<>`&]*[^\s"\'=<>`&/]')
+
+
 class HTMLNode:
+    __slots__ = ('tag', 'value', 'children', 'props')
+
     def __init__(self, tag=None, value=None, children=None, props=None) -> None:
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def to_html(self, minify=False):
+        parts = []
+        self.write_html(parts.append, minify)
+        return ''.join(parts)
+
+    def write_html(self, write, minify=False):
         raise NotImplementedError
 
-    def props_to_html(self):
-        result = ''
-        if self.props is not None:
-            for key, value in self.props.items():
-                result += f' {key}="{value}"'
-        return result
+    def props_to_html(self, minify=False):
+        if self.props is None:
+            return ''
+        if minify:
+            return ''.join(
+                [
+                    f' {key}={value}' if unquoted_value_pattern.fullmatch(value) else f' {key}="{value}"'
+                    for key, value in self.props.items()
+                ]
+            )
+        return ''.join([f' {key}="{value}"' for key, value in self.props.items()])
 
     def __repr__(self) -> str:
         return f'HTMLNode({self.tag}/{self.value}/{self.children}/{self.props}'
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None) -> None:
         super().__init__(tag=tag, value=value, props=props)
 
-    def to_html(self):
+    def write_html(self, write, minify=False):
         if self.value is None:
             raise ValueError('Not value provided to LeafNode')
         if not self.tag:
-            return self.value
-        return f'<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>'
+            write(self.value)
+        else:
+            write(f'<{self.tag}{self.props_to_html(minify)}>{self.value}</{self.tag}>')
 
     def __repr__(self) -> str:
         return f'LeafNode({self.tag}, {self.value}, {self.props})'
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, children=None, props=None) -> None:
         super().__init__(tag=tag, children=children, props=props)
 
-    def to_html(self):
+    def write_html(self, write, minify=False):
+        self._write_open(write, minify)
+        stack = [(self.tag, iter(self.children))]
+        while stack:
+            tag, children = stack[-1]
+            for c in children:
+                if isinstance(c, ParentNode):
+                    c._write_open(write, minify)
+                    stack.append((c.tag, iter(c.children)))
+                    break
+                c.write_html(write, minify)
+            else:
+                stack.pop()
+                write(f'</{tag}>')
+
+    def _write_open(self, write, minify=False):
         if not self.tag:
             raise ValueError('No tag provided')
         if not self.children:
             raise ValueError('No children provided')
-        children_string = ''
-        for c in self.children:
-            children_string += c.to_html()
-        return f'<{self.tag}{self.props_to_html()}>{children_string}</{self.tag}>'
+        write(f'<{self.tag}{self.props_to_html(minify)}>')
 
     def __repr__(self) -> str:
         return f'ParentNode({self.tag}, {self.children}, {self.props})'
@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from fileutils import make_dirs, remove_output
+from manifest import hash_file
+from static_sync import walk_files
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_INDEX_VERSION = 1
+image_suffixes = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+resizable_suffixes = ('.png', '.jpg', '.jpeg', '.webp')
+default_widths = (480, 960, 1600)
+
+
+def image_size(path):
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+            return None
+        if head[:2] == b'\xff\xd8':
+            f.seek(2)
+            return jpeg_size(f)
+    return None
+
+
+def jpeg_size(f):
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        kind = marker[1]
+        if kind == 0x01 or 0xD0 <= kind <= 0xD9:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if 0xC0 <= kind <= 0xCF and kind not in (0xC4, 0xC8, 0xCC):
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(int.from_bytes(length, 'big') - 2, os.SEEK_CUR)
+
+
+def resize_image(task):
+    source, dest, width, height = task
+    with Image.open(source) as image:
+        resized = image.resize((width, height), Image.LANCZOS)
+        options = {'optimize': True}
+        if dest.lower().endswith(('.jpg', '.jpeg', '.webp')):
+            options['quality'] = 82
+        if dest.lower().endswith(('.jpg', '.jpeg')) and resized.mode not in ('RGB', 'L'):
+            resized = resized.convert('RGB')
+        tmp_path = f'{dest}.tmp'
+        resized.save(tmp_path, format=image.format, **options)
+    os.replace(tmp_path, dest)
+
+
+def try_resize(resize, task):
+    try:
+        resize(task)
+    except Exception as e:
+        if os.path.exists(f'{task[1]}.tmp'):
+            os.remove(f'{task[1]}.tmp')
+        return f'{type(e).__name__}: {e}'
+    return None
+
+
+def variant_name(rel, width):
+    base, suffix = os.path.splitext(rel)
+    return f'{base}-{width}w{suffix}'
+
+
+class ImageResult:
+    def __init__(self) -> None:
+        self.generated = []
+        self.reused = 0
+        self.removed = []
+        self.errors = []
+
+    def __repr__(self) -> str:
+        return (
+            f'ImageResult({len(self.generated)} generated, {self.reused} reused, {len(self.removed)} removed, '
+            f'{len(self.errors)} failed)'
+        )
+
+
+class ImagePipeline:
+    def __init__(self, widths=default_widths, resize=None) -> None:
+        self.enabled = False
+        self.widths = tuple(sorted(widths))
+        self.resize = resize if resize is not None else (resize_image if Image is not None else None)
+        self.entries = {}
+        self.props = {}
+        self.sources = {}
+
+    def load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == IMAGE_INDEX_VERSION:
+            self.entries = data['entries']
+
+    def save(self, path):
+        make_dirs(os.path.dirname(path))
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': IMAGE_INDEX_VERSION, 'entries': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def process(self, static_path, public_path, cache_path, jobs=1):
+        result = ImageResult()
+        entries = {}
+        sources = {}
+        pending = []
+        copies = []
+        for path, stat in walk_files(static_path):
+            if not path.lower().endswith(image_suffixes):
+                continue
+            rel = os.path.relpath(path, static_path).replace(os.sep, '/')
+            entry = self.entries.get(rel)
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                size = image_size(path)
+                if size is None:
+                    continue
+                entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': hash_file(path)}
+                entry['width'], entry['height'] = size
+            entry = dict(entry, variants=[])
+            if self.resize is not None and rel.lower().endswith(resizable_suffixes):
+                for width in self.widths:
+                    if width >= entry['width']:
+                        break
+                    height = max(1, round(entry['height'] * width / entry['width']))
+                    cached = os.path.join(cache_path, f'{entry["hash"][:32]}-{width}{os.path.splitext(rel)[1].lower()}')
+                    if os.path.exists(cached):
+                        result.reused += 1
+                    else:
+                        pending.append((path, cached, width, height))
+                    copies.append((cached, os.path.join(public_path, variant_name(rel, width))))
+                    entry['variants'].append([variant_name(rel, width), width])
+            entries[rel] = entry
+            sources[f'/{rel}'] = os.path.normpath(path)
+
+        if pending:
+            make_dirs(cache_path)
+        if jobs <= 1 or len(pending) <= 1:
+            errors = [try_resize(self.resize, task) for task in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                errors = list(executor.map(partial(try_resize, self.resize), pending))
+        failed = set()
+        for task, error in zip(pending, errors):
+            if error is None:
+                result.generated.append(task[1])
+                continue
+            rel = os.path.relpath(task[0], static_path).replace(os.sep, '/')
+            result.errors.append((rel, error))
+            failed.add(task[1])
+            entries[rel]['variants'] = [variant for variant in entries[rel]['variants'] if variant[1] != task[2]]
+
+        for cached, dest in copies:
+            if cached in failed:
+                continue
+            try:
+                current = os.stat(dest)
+            except OSError:
+                current = None
+            cached_stat = os.stat(cached)
+            if current is None or current.st_mtime_ns != cached_stat.st_mtime_ns or current.st_size != cached_stat.st_size:
+                make_dirs(os.path.dirname(dest))
+                shutil.copy2(cached, dest)
+
+        live = {name for entry in entries.values() for name, _ in entry['variants']}
+        for rel, entry in sorted(self.entries.items()):
+            for name, _ in entry.get('variants', ()):
+                if name not in live:
+                    remove_output(os.path.join(public_path, name), public_path)
+                    result.removed.append(name)
+        self.entries = entries
+        self.sources = sources
+        self.props = {f'/{rel}': image_props(rel, entry) for rel, entry in entries.items()}
+        return result
+
+    def inputs(self, links):
+        return [self.sources[url] for tag, url in links if tag == 'img' and url in self.sources]
+
+    def __repr__(self) -> str:
+        return f'ImagePipeline({len(self.entries)} images, widths {list(self.widths)})'
+
+
+def image_props(rel, entry):
+    props = {'width': str(entry['width']), 'height': str(entry['height']), 'loading': 'lazy', 'decoding': 'async'}
+    if entry['variants']:
+        candidates = [f'/{name} {width}w' for name, width in entry['variants']]
+        candidates.append(f'/{rel} {entry["width"]}w')
+        props['srcset'] = ', '.join(candidates)
+        props['sizes'] = f'(max-width: {entry["width"]}px) 100vw, {entry["width"]}px'
+    return props
@@ -1,9 +1,51 @@
-import re
-
-
 def extract_markdown_images(text):
-    return re.findall(r'!\[(.*?)\]\((.*?)\)', text)
+    return [(alt, url) for _, _, alt, url in iter_markdown_images(text)]
 
 
 def extract_markdown_links(text):
-    return re.findall(r'(?<!!)\[(.*?)\]\((.*?)\)', text)
+    return [(alt, url) for _, _, alt, url in iter_markdown_links(text)]
+
+
+def iter_markdown_images(text, pos=0, end=None):
+    return _iter_spans(text, '![', pos, end, False)
+
+
+def iter_markdown_links(text, pos=0, end=None):
+    return _iter_spans(text, '[', pos, end, True)
+
+
+def _iter_spans(text, opener, pos, end, skip_images):
+    # Matches the lazy patterns r'!\[(.*?)\]\((.*?)\)' and r'(?<!!)\[(.*?)\]\((.*?)\)'
+    # in a single pass: the next '](', ')' and newline are only ever searched
+    # forward, so malformed input cannot make a candidate rescan the line.
+    if end is None:
+        end = len(text)
+    find = text.find
+    width = len(opener)
+    close = paren = newline = -1
+    start = find(opener, pos, end)
+    while start != -1:
+        if skip_images and start > 0 and text[start - 1] == '!':
+            start = find(opener, start + 1, end)
+            continue
+        alt = start + width
+        if close < alt:
+            close = _find(text, '](', alt, end)
+        if newline < alt:
+            newline = _find(text, '\n', alt, end)
+        if close < newline:
+            url = close + 2
+            if paren < url:
+                paren = _find(text, ')', url, end)
+            if newline < url:
+                newline = _find(text, '\n', url, end)
+            if paren < newline:
+                yield start, paren + 1, text[alt:close], text[url:paren]
+                start = find(opener, paren + 1, end)
+                continue
+        start = find(opener, start + 1, end)
+
+
+def _find(text, sub, pos, end):
+    index = text.find(sub, pos, end)
+    return end if index == -1 else index
@@ -0,0 +1,51 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class IOPipeline:
+    def __init__(self, threads=0, prefetch=32, write_behind=32) -> None:
+        self.threads = threads
+        self.prefetch = prefetch
+        self.write_behind = write_behind
+
+    def run(self, items, read, process, write):
+        return asyncio.run(self._run(list(items), read, process, write))
+
+    async def _run(self, items, read, process, write):
+        loop = asyncio.get_running_loop()
+        results = [None] * len(items)
+        reads = asyncio.Queue(self.prefetch)
+        writes = asyncio.Queue(self.write_behind)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.threads)) as executor:
+
+            async def read_ahead():
+                for index, item in enumerate(items):
+                    await reads.put((index, item, loop.run_in_executor(executor, read, item)))
+                await reads.put(None)
+
+            async def write_behind():
+                while (entry := await writes.get()) is not None:
+                    index, future = entry
+                    try:
+                        results[index] = (None, await future)
+                    except Exception as e:
+                        results[index] = (e, None)
+
+            reader = asyncio.create_task(read_ahead())
+            writer = asyncio.create_task(write_behind())
+            while (entry := await reads.get()) is not None:
+                index, item, future = entry
+                try:
+                    output = process(item, await future)
+                except Exception as e:
+                    results[index] = (e, None)
+                    continue
+                await writes.put((index, loop.run_in_executor(executor, write, item, output)))
+            await writes.put(None)
+            await reader
+            await writer
+        return results
+
+    def __repr__(self) -> str:
+        return f'IOPipeline({self.threads} threads, prefetch {self.prefetch}, write-behind {self.write_behind})'
@@ -0,0 +1,141 @@
+import json
+import os
+import re
+from datetime import date, datetime, timezone
+from urllib.parse import unquote, urljoin, urlsplit
+from xml.sax.saxutils import escape
+
+from fileutils import write_atomic
+
+SITEMAP_NAME = 'sitemap.xml'
+FEED_NAME = 'feed.xml'
+BACKLINKS_NAME = 'backlinks.json'
+SITEMAP_LIMIT = 50000
+
+plain_path_pattern = re.compile(r'[?#%]|/\.\.?(?:/|$)')
+
+
+def resolve_link(page_url, href):
+    if href.startswith('/') and not href.startswith('//') and not plain_path_pattern.search(href):
+        target = href
+    else:
+        parts = urlsplit(href)
+        if parts.scheme or parts.netloc or not parts.path:
+            return None
+        target = unquote(urlsplit(urljoin(page_url, parts.path)).path)
+    if target.endswith('/index.html'):
+        return target[: -len('index.html')]
+    return target
+
+
+class LinkGraph:
+    def __init__(self) -> None:
+        self.pages = {}
+        self.links = {}
+
+    def add(self, source, url, title, mtime, links):
+        self.pages[url] = (source, title, mtime)
+        self.links[url] = [(tag, href, resolve_link(url, href)) for tag, href in links]
+
+    def page_url(self, target):
+        if target in self.pages:
+            return target
+        if not target.endswith('/') and target + '/' in self.pages:
+            return target + '/'
+        return None
+
+    def broken(self, exists):
+        broken = []
+        for url, links in sorted(self.links.items()):
+            for _, href, target in links:
+                if target is not None and self.page_url(target) is None and not exists(target):
+                    broken.append((self.pages[url][0], href))
+        return broken
+
+    def backlinks(self):
+        index = {}
+        for url, links in self.links.items():
+            for tag, _, target in links:
+                if tag != 'a' or target is None:
+                    continue
+                target = self.page_url(target)
+                if target is not None and target != url:
+                    index.setdefault(target, set()).add(url)
+        return {target: sorted(sources) for target, sources in sorted(index.items())}
+
+    def sitemaps(self, site_url, limit=SITEMAP_LIMIT):
+        urls = sorted(self.pages)
+        chunks = [urls[i : i + limit] for i in range(0, len(urls), limit)] or [[]]
+        if len(chunks) == 1:
+            return {SITEMAP_NAME: self.sitemap(site_url, chunks[0])}
+        files = {f'sitemap-{i}.xml': self.sitemap(site_url, chunk) for i, chunk in enumerate(chunks, 1)}
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+        for name in files:
+            lines.append(f'<sitemap><loc>{escape(f"{site_url}/{name}")}</loc></sitemap>')
+        lines.append('</sitemapindex>')
+        files[SITEMAP_NAME] = '\n'.join(lines) + '\n'
+        return files
+
+    def sitemap(self, site_url, urls):
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+        for url in urls:
+            lastmod = date.fromtimestamp(self.pages[url][2]).isoformat()
+            lines.append(f'<url><loc>{escape(site_url + url)}</loc><lastmod>{lastmod}</lastmod></url>')
+        lines.append('</urlset>')
+        return '\n'.join(lines) + '\n'
+
+    def feed(self, site_url, limit=20):
+        entries = sorted(self.pages.items(), key=lambda item: (-item[1][2], item[0]))[:limit]
+        home = self.pages.get('/')
+        title = home[1] if home is not None and home[1] else site_url
+        updated = timestamp(entries[0][1][2]) if entries else timestamp(0)
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<feed xmlns="http://www.w3.org/2005/Atom">',
+            f'<title>{escape(title)}</title>',
+            f'<id>{escape(site_url)}/</id>',
+            f'<link href="{escape(site_url)}/"/>',
+            f'<link rel="self" href="{escape(f"{site_url}/{FEED_NAME}")}"/>',
+            f'<updated>{updated}</updated>',
+        ]
+        for url, (_, page_title, mtime) in entries:
+            lines.append(
+                f'<entry><title>{escape(page_title or url)}</title><link href="{escape(site_url + url)}"/>'
+                f'<id>{escape(site_url + url)}</id><updated>{timestamp(mtime)}</updated></entry>'
+            )
+        lines.append('</feed>')
+        return '\n'.join(lines) + '\n'
+
+    def __repr__(self) -> str:
+        return f'LinkGraph({len(self.pages)} pages, {sum(map(len, self.links.values()))} links)'
+
+
+def timestamp(mtime):
+    return datetime.fromtimestamp(mtime, timezone.utc).isoformat(timespec='seconds')
+
+
+class SiteLinks:
+    def __init__(self, site_url=None, backlinks=False) -> None:
+        self.site_url = site_url
+        self.backlinks = backlinks
+
+    def write(self, graph, public_path):
+        written = []
+        if self.site_url:
+            site_url = self.site_url.rstrip('/')
+            files = graph.sitemaps(site_url)
+            files[FEED_NAME] = graph.feed(site_url)
+            for name, text in files.items():
+                write_atomic(os.path.join(public_path, name), lambda f: f.write(text))
+                written.append(name)
+        if self.backlinks:
+            index = graph.backlinks()
+            write_atomic(
+                os.path.join(public_path, BACKLINKS_NAME),
+                lambda f: json.dump(index, f, ensure_ascii=False, separators=(',', ':')),
+            )
+            written.append(BACKLINKS_NAME)
+        return written
+
+    def __repr__(self) -> str:
+        return f'SiteLinks({self.site_url}, backlinks={self.backlinks})'
@@ -1,63 +1,763 @@
+import argparse
+import html
 import os
 import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import cache, partial
 from pathlib import Path
 
-from markdown_blocks import extarct_title, markdown_to_html_node
+from assets import AssetFingerprints
+from block_cache import BlockCache
+from compress import compress_encodings, compress_site
+from config import BuildConfig
+from daemon import BuildDaemon, serve_daemon
+from devserver import LiveReload, Watcher, start_server
+from fileserver import FileCache, start_file_server
+from fileutils import make_dirs, remove_output, remove_tree, write_atomic
+from htmlnode import LeafNode, ParentNode
+from images import ImagePipeline
+from io_pipeline import IOPipeline
+from linkgraph import LinkGraph, SiteLinks
+from manifest import Manifest, try_hash_file
+from markdown_blocks import (
+    markdown_to_blocks,
+    no_stage,
+    parse_blocks,
+    parse_document,
+    read_blocks,
+    scan_metadata,
+    write_blocks,
+)
+from profiling import Profiler
+from search_index import SearchIndex
+from static_sync import sync_checks, sync_modes, sync_static
+from template import TemplateCache, resolve_template, template_name
 
+STREAM_THRESHOLD = 8 << 20
 
-def main():
-    public_path = '/home/jose/bootdev/static_site_generator/public/'
-    static_path = '/home/jose/bootdev/static_site_generator/static/'
-    if os.path.exists(public_path):
-        shutil.rmtree(public_path)
-    os.mkdir(public_path)
-    copy_files(static_path, public_path)
-    generate_pages_recursive('./content/', './template.html', './public/')
+templates = TemplateCache()
+blocks = BlockCache()
+profiler = Profiler()
+io_pipeline = IOPipeline()
+search = SearchIndex()
+site_links = SiteLinks()
+images = ImagePipeline()
+assets = AssetFingerprints()
+image_props = {}
 
 
-def copy_files(current_path, destination):
-    for f in os.listdir(current_path):
-        joined_path = os.path.join(current_path, f)
-        if os.path.isfile(joined_path):
-            shutil.copy(joined_path, destination)
+def build_parser():
+    defaults = BuildConfig()
+    parser = argparse.ArgumentParser(description='Build the static site into public/.')
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='keep public/ and only re-render pages whose markdown or template changed',
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='render pages in N worker processes (default: 1, 0 uses every CPU)',
+    )
+    parser.add_argument(
+        '--static-mode',
+        choices=sync_modes,
+        default='copy',
+        help='how changed static files reach public/ (default: copy)',
+    )
+    parser.add_argument(
+        '--static-check',
+        choices=sync_checks,
+        default='mtime',
+        help='skip static files whose size and mtime match, or whose hash matches (default: mtime)',
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='time each build stage and page, print the slowest pages and write a JSON report',
+    )
+    parser.add_argument(
+        '--profile-output',
+        default=defaults.profile_path,
+        metavar='PATH',
+        help=f'where --profile writes its JSON report (default: {defaults.profile_path})',
+    )
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N', help='slowest pages to print (default: 10)')
+    parser.add_argument(
+        '--io-threads',
+        type=int,
+        default=0,
+        metavar='N',
+        help='overlap source reads and output writes with rendering using N I/O threads (default: 0, blocking I/O)',
+    )
+    parser.add_argument(
+        '--no-block-cache',
+        dest='block_cache',
+        action='store_false',
+        help=f'do not load or save rendered blocks in {defaults.block_cache_path}',
+    )
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help=f'write pre-compressed {"/".join(compress_encodings())} siblings of text files in public/',
+    )
+    parser.add_argument(
+        '--minify',
+        action='store_true',
+        help='collapse template whitespace, strip comments and drop redundant attribute quotes while rendering',
+    )
+    parser.add_argument(
+        '--images',
+        action='store_true',
+        help='resize static images into cached srcset variants and add width, height and lazy loading to img tags',
+    )
+    parser.add_argument(
+        '--fingerprint',
+        action='store_true',
+        help='copy static assets to content-hashed names and point templates and img tags at them',
+    )
+    parser.add_argument(
+        '--search',
+        action='store_true',
+        help=f'write a sharded full-text search index to {defaults.search_path}/',
+    )
+    parser.add_argument(
+        '--site-url',
+        metavar='URL',
+        help='absolute site URL; writes sitemap.xml and an Atom feed.xml that link pages under it',
+    )
+    parser.add_argument(
+        '--backlinks',
+        action='store_true',
+        help='write backlinks.json mapping each page URL to the pages that link to it',
+    )
+    parser.add_argument('--explain', action='store_true', help='print which changed inputs caused each page to be rebuilt')
+    subparsers = parser.add_subparsers(dest='command')
+    serve = subparsers.add_parser('serve', help='build, then serve public/ over HTTP')
+    serve.add_argument('--port', type=int, default=8888)
+    serve.add_argument(
+        '--cache-size',
+        type=int,
+        default=64,
+        metavar='MB',
+        help='memory for hot files served without --watch (default: 64)',
+    )
+    serve.add_argument(
+        '--watch',
+        action='store_true',
+        help='rebuild changed pages and static files on save and live-reload open browsers',
+    )
+    daemon = subparsers.add_parser('daemon', help='keep caches warm and build on requests sent to a local socket')
+    daemon.add_argument(
+        '--socket',
+        default=defaults.daemon_socket_path,
+        metavar='PATH',
+        help=f'Unix socket to listen on (default: {defaults.daemon_socket_path})',
+    )
+    daemon.add_argument('--port', type=int, metavar='N', help='listen on 127.0.0.1:N instead of a Unix socket')
+    return parser
+
+
+def parse_config(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error('--jobs must be 0 or a positive number')
+    if args.io_threads < 0:
+        parser.error('--io-threads must be 0 or a positive number')
+    config = BuildConfig(
+        incremental=args.incremental or (args.command == 'serve' and args.watch),
+        jobs=args.jobs or os.cpu_count(),
+        static_mode=args.static_mode,
+        static_check=args.static_check,
+        explain=args.explain,
+        compress=args.compress,
+        minify=args.minify,
+        search=args.search,
+        images=args.images,
+        fingerprint=args.fingerprint,
+        site_url=args.site_url,
+        backlinks=args.backlinks,
+        io_threads=args.io_threads,
+        profile=args.profile_output if args.profile else None,
+        profile_top=args.profile_top,
+        block_cache=args.block_cache,
+    )
+    return args, config
+
+
+def main(argv=None):
+    args, config = parse_config(argv)
+    if args.command == 'daemon':
+        serve_daemon(args.socket if args.port is None else ('127.0.0.1', args.port), BuildDaemon(build, parse_config))
+        return
+    manifest, result = build(config)
+    if args.command == 'serve':
+        serve_site(manifest, config, args.port, args.watch, args.cache_size << 20)
+    elif result.errors:
+        sys.exit(1)
+
+
+def build(config, manifest=None):
+    configure(config)
+    manifest, result = build_site(config, manifest)
+    if profiler.enabled:
+        print(profiler.report(config.profile_top))
+        profiler.write_json(config.profile)
+        print(f'Wrote profile to {config.profile}')
+        profiler.enabled = False
+    return manifest, result
+
+
+def configure(config):
+    profiler.enabled = config.profile is not None
+    if profiler.enabled:
+        profiler.clear()
+    io_pipeline.threads = config.io_threads
+    templates.minify = config.minify
+    templates.assets = assets if config.fingerprint else None
+    search.enabled = config.search
+    images.enabled = config.images
+    assets.enabled = config.fingerprint
+    site_links.site_url = config.site_url
+    site_links.backlinks = config.backlinks
+
+
+def build_site(config, manifest=None):
+    warm = manifest is not None
+    incremental = config.incremental
+    if not incremental:
+        manifest = Manifest()
+        search.clear()
+        if os.path.exists(config.public_path):
+            remove_tree(config.public_path)
+    elif not warm:
+        manifest = Manifest.load(config.manifest_path)
+        if config.block_cache:
+            blocks.load(config.block_cache_path)
+        if search.enabled:
+            search.load(config.search_path)
+    os.makedirs(config.public_path, exist_ok=True)
+    with profiler.stage('copy_static'):
+        synced = sync_static(config.static_path, config.public_path, manifest, config.static_mode, config.static_check)
+    print(
+        f'Synced static files: {len(synced.copied)} copied, {synced.skipped} unchanged, {len(synced.removed)} removed'
+    )
+    if images.enabled:
+        if not warm:
+            images.load(config.image_index_path)
+        if images.resize is None:
+            print('Pillow is not installed: --images adds image sizes and lazy loading but no resized variants')
+        with profiler.stage('images'):
+            processed = images.process(config.static_path, config.public_path, config.image_cache_path, config.jobs)
+        for rel, error in processed.errors:
+            print(f'Error resizing image {rel}: {error}')
+        print(
+            f'Image variants: {len(processed.generated)} generated, {processed.reused} cached, '
+            f'{len(processed.removed)} removed'
+        )
+    if assets.enabled:
+        if not warm:
+            assets.load(config.asset_index_path)
+        with profiler.stage('fingerprint'):
+            fingerprinted = assets.process(config.static_path, config.public_path)
+        print(
+            f'Fingerprinted assets: {len(fingerprinted.written)} written, {fingerprinted.hashed} hashed, '
+            f'{len(fingerprinted.removed)} removed'
+        )
+    update_image_props()
+    options = render_options()
+    if incremental and manifest.options != options:
+        print('Render options changed, rebuilding every page')
+        incremental = False
+    manifest.options = options
+    result = build_pages(
+        config.content_path,
+        config.template_path,
+        config.public_path,
+        manifest,
+        incremental,
+        jobs=config.jobs,
+        explain=config.explain,
+    )
+    if search.enabled:
+        with profiler.stage('search_index'):
+            written = search.write(config.search_path)
+        print(f'Search index: {len(search.pages)} pages, {len(search.postings)} terms, {written} shards written')
+    with profiler.stage('links'):
+        check_links(manifest, config)
+    if config.compress:
+        with profiler.stage('compress'):
+            compressed = compress_site(config.public_path, manifest, config.jobs)
+        print(
+            f'Compressed files: {len(compressed.compressed)} written, {compressed.skipped} unchanged, '
+            f'{len(compressed.removed)} removed'
+        )
+    save_state(manifest, config)
+    return manifest, result
+
+
+def save_state(manifest, config):
+    manifest.save(config.manifest_path)
+    if config.block_cache:
+        blocks.save(config.block_cache_path)
+    if images.enabled:
+        images.save(config.image_index_path)
+    if assets.enabled:
+        assets.save(config.asset_index_path)
+
+
+def render_options():
+    options = {'minify': templates.minify}
+    if images.enabled:
+        options['images'] = list(images.widths) if images.resize is not None else []
+    if assets.enabled:
+        options['fingerprint'] = True
+    return options
+
+
+def update_image_props():
+    props = images.props if images.enabled else {}
+    if assets.enabled:
+        props = assets.image_props(props)
+    image_props.clear()
+    image_props.update(props)
+
+
+def serve_site(manifest, config, port, watch=False, cache_size=64 << 20, interval=0.2):
+    livereload = LiveReload()
+    if watch:
+        server = start_server(config.public_path, port, livereload)
+    else:
+        server = start_file_server(config.public_path, port, FileCache(cache_size))
+    print(f'Serving {config.public_path} on http://localhost:{port}/')
+    watcher = Watcher([config.content_path, config.static_path, config.template_path]) if watch else None
+    try:
+        while True:
+            time.sleep(interval)
+            if watcher is None:
+                continue
+            changed, removed = watcher.poll()
+            if not changed and not removed:
+                continue
+            start = time.perf_counter()
+            rebuilt = apply_changes(changed, removed, manifest, config)
+            if search.enabled:
+                search.write(config.search_path)
+            check_links(manifest, config, rebuilt)
+            save_state(manifest, config)
+            livereload.notify()
+            print(f'Rebuilt in {(time.perf_counter() - start) * 1000:.1f} ms')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+def apply_changes(changed, removed, manifest, config):
+    content_path, static_path, public_path = config.content_path, config.static_path, config.public_path
+    removed = {os.path.normpath(path) for path in removed}
+    inputs = []
+    static_inputs = []
+    for path in sorted({os.path.normpath(path) for path in changed} | removed):
+        if is_under(path, static_path):
+            static_inputs.append(path)
         else:
-            new_destination = os.path.join(destination, f)
-            os.mkdir(new_destination)
-            copy_files(joined_path, new_destination)
+            inputs.append(path)
+
+    if static_inputs:
+        synced = sync_static(static_path, public_path, manifest, config.static_mode, config.static_check)
+        for rel in synced.copied + synced.removed:
+            print(f'Synced static file {rel}')
+        if images.enabled:
+            processed = images.process(static_path, public_path, config.image_cache_path, config.jobs)
+            for rel, error in processed.errors:
+                print(f'Error resizing image {rel}: {error}')
+        if assets.enabled:
+            assets.process(static_path, public_path)
+        update_image_props()
+
+    rebuild = {}
+    for source, paths in manifest.deps.affected(inputs + static_inputs).items():
+        rebuild[source] = [f'{path} removed' if path in removed else f'{path} changed' for path in paths]
+    for path in inputs:
+        if os.path.basename(path) == template_name:
+            if path not in removed and path not in manifest.deps.dependents:
+                for source in manifest.pages:
+                    if is_under(source, os.path.dirname(path)):
+                        rebuild.setdefault(source, []).append(f'{path} added')
+        elif is_under(path, content_path):
+            if path in removed:
+                rebuild.pop(path, None)
+                if path in manifest.pages:
+                    remove_output(manifest.remove(path), public_path)
+                if search.enabled:
+                    search.remove(path)
+            elif path not in manifest.pages:
+                rebuild[path] = ['new page']
+
+    rebuilt = []
+    for source, reasons in sorted(rebuild.items()):
+        if config.explain:
+            print(f'Rebuild {source}: {"; ".join(reasons)}')
+        destination_path = page_destination(source, content_path, public_path)
+        page_template = resolve_template(source, content_path, config.template_path)
+        url = page_url(destination_path, public_path)
+        try:
+            rendered = generate_page(source, page_template, destination_path, url)
+        except Exception as e:
+            print(f'Error generating page {source}: {type(e).__name__}: {e}')
+            continue
+        hashes = {path: try_hash_file(path) for path in map(os.path.normpath, rendered.inputs)}
+        manifest.record(source, destination_path, page_template, hashes, rendered.title, rendered.links)
+        if search.enabled:
+            search.update(source, url, rendered.title, rendered.text)
+        rebuilt.append(source)
+    return rebuilt
+
+
+def check_links(manifest, config, sources=None):
+    public_path = config.public_path
+    graph = LinkGraph()
+    for source in sorted(manifest.pages if sources is None else sources):
+        entry = manifest.pages.get(source)
+        try:
+            mtime = os.path.getmtime(source)
+        except OSError:
+            continue
+        graph.add(source, page_url(entry['output'], public_path), entry['title'], mtime, entry['links'])
+    broken = graph.broken(lambda target: os.path.exists(os.path.join(public_path, target.lstrip('/'))))
+    for source, href in broken:
+        print(f'Broken link in {source}: {href}')
+    if sources is not None:
+        print(f'Checked {graph}: {len(broken)} broken')
+        return broken
+    written = site_links.write(graph, public_path)
+    print(f'Checked {graph}: {len(broken)} broken' + (f', wrote {", ".join(written)}' if written else ''))
+    return broken
+
+
+def is_under(path, root):
+    path = os.path.abspath(path)
+    root = os.path.abspath(root)
+    return path == root or path.startswith(root + os.sep)
 
 
-def generate_page(from_path, template_path, dest_path):
+def generate_page(from_path, template_path, dest_path, url=None):
     print(f'Generation page from {from_path} to {dest_path} using {template_path}')
+    return render_page(from_path, template_path, dest_path, url)
+
+
+def render_page(from_path, template_path, dest_path, url=None):
+    stage = profiler.stage if profiler.enabled else no_stage
+    with profiler.page_timer(from_path, dest_path) as page:
+        texts = [] if search.enabled else None
+        links = []
+        size = os.path.getsize(from_path)
+        streamed = size >= STREAM_THRESHOLD
+        if streamed:
+            with stage('scan_metadata'):
+                title, description = scan_metadata(read_blocks(from_path))
+            content = partial(
+                write_blocks,
+                read_blocks(from_path),
+                minify=templates.minify,
+                texts=texts,
+                links=links,
+                image_props=image_props,
+                stage=stage,
+            )
+        else:
+            with stage('read', size):
+                with open(from_path, encoding='utf-8') as f:
+                    markdown = f.read()
+            with stage('split_blocks'):
+                block_list = markdown_to_blocks(markdown)
+            document = parse_blocks(block_list, blocks, minify=templates.minify, image_props=image_props, stage=stage)
+            title, description, content = document.title, document.description, document.node
+            if texts is not None:
+                texts.append(document.text)
+            links = document.links
+        if title is None:
+            raise Exception('No header in markdown')
+
+        template = templates.get(template_path)
+        values = page_values(title, content, description, os.path.getmtime(from_path), url)
+        make_dirs(os.path.dirname(dest_path))
+        if streamed:
+
+            def write_page(f):
+                with stage('template'):
+                    template.write(f.write, values)
+
+            with stage('write'):
+                write_atomic(dest_path, write_page)
+        else:
+            with stage('template'):
+                output = template.render(values)
+            with stage('write'):
+                write_atomic(dest_path, lambda f: f.write(output))
+        if page is not None:
+            page['bytes_in'] = size
+            page['bytes_out'] = os.path.getsize(dest_path)
+            profiler.add_bytes('write', page['bytes_out'])
+    text = '\n\n'.join(texts) if texts is not None else ''
+    return RenderedPage(page_inputs(from_path, template_path, links), title, text, links)
+
+
+def render_markdown(markdown, template_path, mtime, url=None):
+    document = parse_document(markdown, blocks, minify=templates.minify, image_props=image_props)
+    if document.title is None:
+        raise Exception('No header in markdown')
+    values = page_values(document.title, document.node, document.description, mtime, url)
+    return templates.get(template_path).render(values), document
 
-    with open(from_path, encoding='utf-8') as f:
-        markdown = f.read()
 
-    with open(template_path, encoding='utf-8') as f:
-        template = f.read()
+def page_values(title, content, description, mtime, url=None):
+    return {
+        'Title': title,
+        'Content': content,
+        'Description': html.escape(description),
+        'Date': date.fromtimestamp(mtime).isoformat(),
+        'Nav': page_nav(url) if url is not None else '',
+    }
 
-    html = markdown_to_html_node(markdown).to_html()
-    title = extarct_title(markdown)
 
-    formatted_template = template.replace('{{ Title }}', title).replace('{{ Content }}', html)
+def page_inputs(from_path, template_path, links):
+    inputs = [from_path, template_path, *templates.get(template_path).inputs]
+    inputs.extend(images.inputs(links))
+    inputs.extend(assets.inputs(links))
+    return list(dict.fromkeys(inputs))
 
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir != '':
-        os.makedirs(dest_dir, exist_ok=True)
 
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(formatted_template)
+def page_destination(origin_path, from_dir_path, dest_dir_path):
+    return Path(os.path.join(dest_dir_path, os.path.relpath(origin_path, from_dir_path))).with_suffix('.html')
 
 
-def generate_pages_recursive(from_dir_path, template_path, dest_dir_path):
-    for f in os.listdir(from_dir_path):
-        origin_path = os.path.join(from_dir_path, f)
-        new_dest_path = os.path.join(dest_dir_path, f)
+def page_url(dest_path, dest_dir_path):
+    url = '/' + os.path.relpath(dest_path, dest_dir_path).replace(os.sep, '/')
+    if url.endswith('/index.html'):
+        return url[: -len('index.html')]
+    return url
 
-        if os.path.isfile(origin_path):
-            destination_path = Path(new_dest_path).with_suffix('.html')
-            generate_page(origin_path, template_path, destination_path)
+
+def page_nav(url):
+    children = [LeafNode('a', 'Home', {'href': '/'})]
+    href = '/'
+    for part in url.strip('/').split('/'):
+        if not part or part == 'index.html':
+            continue
+        href += part if part.endswith('.html') else f'{part}/'
+        children.append(LeafNode(value=' / '))
+        children.append(LeafNode('a', part.removesuffix('.html'), {'href': href}))
+    return ParentNode('nav', children)
+
+
+def discover_pages(from_dir_path, dest_dir_path):
+    stack = [(from_dir_path, dest_dir_path, iter(sorted(os.listdir(from_dir_path))))]
+    while stack:
+        from_dir_path, dest_dir_path, entries = stack[-1]
+        for f in entries:
+            origin_path = os.path.join(from_dir_path, f)
+            new_dest_path = os.path.join(dest_dir_path, f)
+
+            if os.path.isfile(origin_path):
+                if f != template_name:
+                    yield origin_path, Path(new_dest_path).with_suffix('.html')
+            else:
+                stack.append((origin_path, new_dest_path, iter(sorted(os.listdir(origin_path)))))
+                break
+        else:
+            stack.pop()
+
+
+class RenderedPage:
+    def __init__(self, inputs, title, text, links) -> None:
+        self.inputs = inputs
+        self.title = title
+        self.text = text
+        self.links = links
+
+    def __repr__(self) -> str:
+        return f'RenderedPage({self.inputs}, {self.title})'
+
+
+class BuildResult:
+    def __init__(self) -> None:
+        self.rendered = 0
+        self.skipped = 0
+        self.removed = []
+        self.errors = []
+
+    def __repr__(self) -> str:
+        return f'BuildResult({self.rendered}, {self.skipped}, {self.removed}, {self.errors})'
+
+
+def build_pages(from_dir_path, template_path, dest_dir_path, manifest, incremental=False, jobs=1, explain=False):
+    hash_of = cache(try_hash_file)
+    result = BuildResult()
+    sources = []
+    pending = []
+    for origin_path, destination_path in discover_pages(from_dir_path, dest_dir_path):
+        source = os.path.normpath(origin_path)
+        sources.append(source)
+        page_template = resolve_template(origin_path, from_dir_path, template_path)
+        expected_inputs = [source, os.path.normpath(page_template)]
+        for path in expected_inputs:
+            hash_of(path)
+        if incremental:
+            reasons = manifest.rebuild_reasons(source, destination_path, expected_inputs, hash_of)
+            if search.enabled and source not in search:
+                reasons.append('not in the search index')
+            if not reasons:
+                result.skipped += 1
+                continue
         else:
-            generate_pages_recursive(origin_path, template_path, new_dest_path)
+            reasons = ['full build']
+        url = page_url(destination_path, dest_dir_path)
+        pending.append((source, reasons, (origin_path, page_template, destination_path, url)))
+
+    pages = [page for _, _, page in pending]
+    for (source, reasons, page), (error, rendered) in zip(pending, render_pages(pages, jobs)):
+        origin_path, page_template, destination_path, url = page
+        if explain:
+            print(f'Rebuild {source}: {"; ".join(reasons)}')
+        print(f'Generation page from {origin_path} to {destination_path} using {page_template}')
+        if error is not None:
+            print(f'Error generating page {origin_path}: {error}')
+            result.errors.append((origin_path, error))
+            continue
+        hashes = {path: hash_of(path) for path in map(os.path.normpath, rendered.inputs)}
+        manifest.record(source, destination_path, page_template, hashes, rendered.title, rendered.links)
+        if search.enabled:
+            search.update(source, url, rendered.title, rendered.text)
+        result.rendered += 1
+
+    result.removed = manifest.prune(sources)
+    if search.enabled:
+        search.prune(sources)
+    for output in result.removed:
+        remove_output(output, dest_dir_path)
+
+    print(
+        f'Rendered {result.rendered} pages, skipped {result.skipped} unchanged, '
+        f'removed {len(result.removed)} stale, {len(result.errors)} failed '
+        f'(block cache: {blocks.hits} hits, {blocks.misses} misses)'
+    )
+    return result
+
+
+def render_pages(pages, jobs=1):
+    if jobs <= 1 or len(pages) <= 1:
+        return render_batch(pages)
+    batches = split_batches(pages, jobs)
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(batches)),
+        initializer=init_worker,
+        initargs=(worker_settings(), images, assets, dict(image_props)),
+    ) as executor:
+        for batch_results, hits, misses, entries, profile in executor.map(render_worker_batch, batches):
+            results.extend(batch_results)
+            profiler.merge(profile)
+            blocks.hits += hits
+            blocks.misses += misses
+            blocks.update(entries)
+    return results
+
+
+def worker_settings():
+    return {
+        'minify': templates.minify,
+        'fingerprint': templates.assets is not None,
+        'search': search.enabled,
+        'profile': profiler.enabled,
+        'io_threads': io_pipeline.threads,
+    }
+
+
+def init_worker(settings, image_pipeline, asset_fingerprints, props):
+    global images, assets
+    images = image_pipeline
+    assets = asset_fingerprints
+    templates.minify = settings['minify']
+    templates.assets = assets if settings['fingerprint'] else None
+    search.enabled = settings['search']
+    profiler.enabled = settings['profile']
+    io_pipeline.threads = settings['io_threads']
+    image_props.clear()
+    image_props.update(props)
+
+
+def split_batches(pages, jobs):
+    size = max(1, -(-len(pages) // (jobs * 4)))
+    return [pages[i : i + size] for i in range(0, len(pages), size)]
+
+
+def render_batch(pages):
+    if io_pipeline.threads and not profiler.enabled:
+        return render_batch_pipelined(pages)
+    results = []
+    for origin_path, template_path, destination_path, url in pages:
+        try:
+            rendered = render_page(origin_path, template_path, destination_path, url)
+        except Exception as e:
+            results.append((f'{type(e).__name__}: {e}', None))
+        else:
+            results.append((None, rendered))
+    return results
+
+
+def render_batch_pipelined(pages):
+    made_dirs = set()
+
+    def read(page):
+        stat = os.stat(page[0])
+        if stat.st_size >= STREAM_THRESHOLD:
+            return None
+        with open(page[0], encoding='utf-8') as f:
+            return f.read(), stat.st_mtime
+
+    def process(page, source):
+        if source is None:
+            return render_page(*page)
+        origin_path, template_path, _, url = page
+        markdown, mtime = source
+        output, document = render_markdown(markdown, template_path, mtime, url)
+        inputs = page_inputs(origin_path, template_path, document.links)
+        text = document.text if search.enabled else ''
+        return output, RenderedPage(inputs, document.title, text, document.links)
+
+    def write(page, output):
+        if isinstance(output, RenderedPage):
+            return output
+        output, rendered = output
+        directory = os.path.dirname(page[2])
+        if directory not in made_dirs:
+            make_dirs(directory)
+            made_dirs.add(directory)
+        write_atomic(page[2], lambda f: f.write(output))
+        return rendered
+
+    results = []
+    for error, rendered in io_pipeline.run(pages, read, process, write):
+        results.append((None, rendered) if error is None else (f'{type(error).__name__}: {error}', None))
+    return results
+
+
+def render_worker_batch(pages):
+    hits, misses = blocks.hits, blocks.misses
+    blocks.track_new_entries()
+    profiler.clear()
+    results = render_batch(pages)
+    return results, blocks.hits - hits, blocks.misses - misses, blocks.take_new_entries(), profiler.export()
 
 
-main()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+
+from depgraph import DependencyGraph
+
+MANIFEST_VERSION = 4
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def try_hash_file(path):
+    try:
+        return hash_file(path)
+    except FileNotFoundError:
+        return None
+
+
+class Manifest:
+    def __init__(self, pages=None, static=None, deps=None, options=None, compressed=None) -> None:
+        self.pages = pages if pages is not None else {}
+        self.static = static if static is not None else {}
+        self.compressed = compressed if compressed is not None else []
+        self.deps = DependencyGraph(deps)
+        self.options = options if options is not None else {}
+        self.saved = None
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            data = json.loads(text)
+        except (OSError, ValueError):
+            return cls()
+        if data.get('version') != MANIFEST_VERSION:
+            return cls()
+        manifest = cls(
+            data.get('pages', {}),
+            data.get('static', {}),
+            data.get('deps', {}),
+            data.get('options', {}),
+            data.get('compressed', []),
+        )
+        manifest.saved = text
+        return manifest
+
+    def save(self, path):
+        data = {
+            'version': MANIFEST_VERSION,
+            'pages': self.pages,
+            'static': self.static,
+            'deps': self.deps.inputs,
+            'options': self.options,
+            'compressed': self.compressed,
+        }
+        text = json.dumps(data, sort_keys=True)
+        if text == self.saved and os.path.exists(path):
+            return
+        dest_dir = os.path.dirname(path)
+        if dest_dir != '':
+            os.makedirs(dest_dir, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        self.saved = text
+
+    def rebuild_reasons(self, source, output, expected_inputs, hash_of):
+        entry = self.pages.get(source)
+        if entry is None:
+            return ['new page']
+        reasons = []
+        for path in self.deps.changed_inputs(source, hash_of):
+            reasons.append(f'{path} removed' if hash_of(path) is None else f'{path} changed')
+        recorded = self.deps.inputs.get(source, {})
+        reasons.extend(f'{path} is a new input' for path in expected_inputs if path not in recorded)
+        if entry['output'] != str(output):
+            reasons.append(f'output moved to {output}')
+        elif not os.path.exists(output):
+            reasons.append('output missing')
+        return reasons
+
+    def record(self, source, output, template_path, inputs, title=None, links=()):
+        self.pages[source] = {
+            'template': str(template_path),
+            'output': str(output),
+            'title': title,
+            'links': [list(link) for link in links],
+        }
+        self.deps.record(source, inputs)
+
+    def remove(self, source):
+        self.deps.remove(source)
+        return self.pages.pop(source)['output']
+
+    def prune(self, live_sources):
+        return [self.remove(source) for source in sorted(set(self.pages) - set(live_sources))]
+
+    def __repr__(self) -> str:
+        return f'Manifest({len(self.pages)} pages, {len(self.static)} static files)'
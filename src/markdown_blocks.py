@@ -1,6 +1,9 @@
+import hashlib
 import re
+from contextlib import nullcontext
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from inline_markdown import iter_markdown_images
 from textnode import text_node_to_html_node, text_to_textnodes
 
 paragraph_type = 'paragraph'
@@ -10,35 +13,38 @@ quote_type = 'quote'
 ordered_list_type = 'ordered_list'
 unordered_list_type = 'unordered_list'
 
+link_attributes = {'a': 'href', 'img': 'src'}
+null_stage = nullcontext()
 
-def text_to_children(text) -> list[HTMLNode]:
+
+def text_to_children(text, image_props=None) -> list[HTMLNode]:
     children = text_to_textnodes(text)
     children_list = []
     for c in children:
-        children_list.append(text_node_to_html_node(c))
+        children_list.append(text_node_to_html_node(c, image_props))
     return children_list
 
 
-def text_to_html(block, block_type):
+def text_to_html(block, block_type, image_props=None):
     if block_type == paragraph_type:
         text = ' '.join(block.split('\n'))
-        children_list = text_to_children(text)
+        children_list = text_to_children(text, image_props)
         return ParentNode('p', children_list)
     if block_type == heading_type:
         count = 0
         while block[count] == '#':
             count += 1
-        children_list = text_to_children(block[count + 1 :])
+        children_list = text_to_children(block[count + 1 :], image_props)
         if len(children_list) > 1:
             return ParentNode(f'h{count}', children_list)
         return LeafNode(f'h{count}', block[count + 1 :])
     if block_type == quote_type:
-        children_list = text_to_children(block[2:])
+        children_list = text_to_children(block[2:], image_props)
         if len(children_list) > 1:
             return ParentNode('blockquote', children_list)
         return LeafNode('blockquote', block[2:])
     if block_type == code_type:
-        children_list = text_to_children(block.strip('```'))
+        children_list = text_to_children(block.strip('```'), image_props)
         if len(children_list) > 1:
             return ParentNode('pre', [ParentNode('code', children_list)])
         return ParentNode('pre', [LeafNode('code', block.strip('```'))])
@@ -46,7 +52,7 @@ def text_to_html(block, block_type):
         items = block.split('\n')
         nodes = []
         for item in items:
-            children_list = text_to_children(item[2:])
+            children_list = text_to_children(item[2:], image_props)
             if len(children_list) > 1:
                 nodes.append(ParentNode('li', children_list))
             else:
@@ -56,7 +62,7 @@ def text_to_html(block, block_type):
         items = block.split('\n')
         nodes = []
         for item in items:
-            children_list = text_to_children(item[3:])
+            children_list = text_to_children(item[3:], image_props)
             if len(children_list) > 1:
                 nodes.append(ParentNode('li', children_list))
             else:
@@ -65,13 +71,117 @@ def text_to_html(block, block_type):
     raise Exception('Invalid block type')
 
 
-def markdown_to_html_node(markdown: str) -> HTMLNode:
-    blocks = markdown_to_blocks(markdown)
+class Document:
+    def __init__(self, node, title, description, outline, text, links=None) -> None:
+        self.node = node
+        self.title = title
+        self.description = description
+        self.outline = outline
+        self.text = text
+        self.links = links if links is not None else []
+        self.word_count = len(text.split())
+
+    def __repr__(self) -> str:
+        return f'Document({self.title}, {len(self.outline)} headings, {self.word_count} words)'
+
+
+def parse_document(markdown: str, cache=None, description_length=160, minify=False, image_props=None) -> Document:
+    return parse_blocks(markdown_to_blocks(markdown), cache, description_length, minify, image_props)
+
+
+def no_stage(name, nbytes=0):
+    return null_stage
+
+
+def parse_blocks(
+    blocks, cache=None, description_length=160, minify=False, image_props=None, stage=no_stage
+) -> Document:
     html_nodes = []
+    texts = []
+    links = []
+    title = None
+    description = None
+    outline = []
     for block in blocks:
+        node, block_type, text, block_links = render_block(block, cache, minify, image_props, stage)
+        html_nodes.append(node)
+        texts.append(text)
+        links.extend(block_links)
+        if block_type == heading_type:
+            level = len(block) - len(block.lstrip('#'))
+            outline.append((level, text.strip()))
+            if title is None and block.startswith('# '):
+                title = block.strip('#').strip()
+        elif block_type == paragraph_type and description is None:
+            description = summarize(text, description_length)
+    return Document(ParentNode('div', html_nodes), title, description or '', outline, '\n\n'.join(texts), links)
+
+
+def render_block(block, cache=None, minify=False, image_props=None, stage=no_stage):
+    if cache is not None:
+        with stage('block_cache'):
+            key, entry = cache.get(block, block_variant(block, minify, image_props))
+        if entry is not None:
+            fragment, block_type, text, links = entry
+            return LeafNode(value=fragment), block_type, text, links
+    with stage('block_type'):
         block_type = block_to_block_type(block)
-        html_nodes.append(text_to_html(block, block_type))
-    return ParentNode('div', html_nodes)
+    with stage('inline'):
+        node = text_to_html(block, block_type, image_props)
+    links = []
+    with stage('node_text'):
+        text = node_text(node, links)
+    if cache is not None:
+        with stage('to_html'):
+            fragment = node.to_html(minify)
+        with stage('block_cache'):
+            cache.put(key, [fragment, block_type, text, links])
+        return LeafNode(value=fragment), block_type, text, links
+    return node, block_type, text, links
+
+
+def block_variant(block, minify=False, image_props=None):
+    variant = 'minify' if minify else ''
+    if image_props and '![' in block:
+        props = [(url, sorted(image_props[url].items())) for *_, url in iter_markdown_images(block) if url in image_props]
+        if props:
+            variant += '|' + hashlib.blake2b(repr(props).encode('utf-8'), digest_size=16).hexdigest()
+    return variant
+
+
+def node_text(node, links=None):
+    parts = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, str):
+            parts.append(current)
+            continue
+        if links is not None and current.tag in link_attributes and current.props:
+            url = current.props.get(link_attributes[current.tag])
+            if url is not None:
+                links.append([current.tag, url])
+        if current.children:
+            if current.tag == 'li':
+                stack.append('\n')
+            stack.extend(reversed(current.children))
+        elif current.tag != 'img' and current.value is not None:
+            if current.tag == 'li':
+                parts.append(current.value + '\n')
+            else:
+                parts.append(current.value)
+    return ''.join(parts).rstrip('\n')
+
+
+def summarize(text, max_length):
+    text = ' '.join(text.split())
+    if len(text) > max_length:
+        text = text[: max_length - 3].rsplit(' ', 1)[0] + '...'
+    return text
+
+
+def markdown_to_html_node(markdown: str, cache=None) -> HTMLNode:
+    return parse_document(markdown, cache).node
 
 
 def markdown_to_blocks(markdown: str):
@@ -81,6 +191,59 @@ def markdown_to_blocks(markdown: str):
     return list(filter(lambda x: x, stripped))
 
 
+def iter_blocks(chunks):
+    parts = []
+    for chunk in chunks:
+        if '\n\n' not in chunk and not (parts and parts[-1].endswith('\n') and chunk.startswith('\n')):
+            parts.append(chunk)
+            continue
+        *complete, rest = (''.join(parts) + chunk).split('\n\n')
+        parts = [rest]
+        for block in complete:
+            block = block.strip(' ').strip('\n')
+            if block:
+                yield block
+    block = ''.join(parts).strip(' ').strip('\n')
+    if block:
+        yield block
+
+
+def read_blocks(path, chunk_size=1 << 16):
+    with open(path, encoding='utf-8') as f:
+        yield from iter_blocks(iter(lambda: f.read(chunk_size), ''))
+
+
+def write_blocks(blocks, write, cache=None, minify=False, texts=None, links=None, image_props=None, stage=no_stage):
+    write('<div>')
+    empty = True
+    for block in blocks:
+        node, _, text, block_links = render_block(block, cache, minify, image_props, stage)
+        with stage('to_html'):
+            node.write_html(write, minify)
+        if texts is not None:
+            texts.append(text)
+        if links is not None:
+            links.extend(block_links)
+        empty = False
+    if empty:
+        raise ValueError('No children provided')
+    write('</div>')
+
+
+def scan_metadata(blocks, description_length=160):
+    title = None
+    description = None
+    for block in blocks:
+        block_type = block_to_block_type(block)
+        if block_type == heading_type and title is None and block.startswith('# '):
+            title = block.strip('#').strip()
+        elif block_type == paragraph_type and description is None:
+            description = summarize(render_block(block)[2], description_length)
+        if title is not None and description is not None:
+            break
+    return title, description or ''
+
+
 def block_to_block_type(block: str):
     if re.fullmatch(r'^[#]{1,6}', block.split()[0]):
         return heading_type
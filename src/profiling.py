@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+PROFILE_VERSION = 1
+
+
+class Profiler:
+    def __init__(self, enabled=False) -> None:
+        self.enabled = enabled
+        self.stages = {}
+        self.pages = []
+        self.page = None
+        self.nested = []
+        self.started = time.perf_counter()
+
+    def clear(self):
+        self.stages = {}
+        self.pages = []
+        self.page = None
+        self.nested = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, nbytes=0):
+        if not self.enabled:
+            yield
+            return
+        self.nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            nested = self.nested.pop()
+            if self.nested:
+                self.nested[-1] += seconds
+            self.record(name, seconds - nested, nbytes)
+
+    def record(self, name, seconds, nbytes=0):
+        totals = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytes': 0})
+        totals['seconds'] += seconds
+        totals['calls'] += 1
+        totals['bytes'] += nbytes
+        if self.page is not None:
+            self.page['stages'][name] = self.page['stages'].get(name, 0.0) + seconds
+
+    def add_bytes(self, name, nbytes):
+        self.stages[name]['bytes'] += nbytes
+
+    @contextmanager
+    def page_timer(self, source, output):
+        if not self.enabled:
+            yield None
+            return
+        self.page = {'source': str(source), 'output': str(output), 'bytes_in': 0, 'bytes_out': 0, 'stages': {}}
+        start = time.perf_counter()
+        try:
+            yield self.page
+        finally:
+            self.page['seconds'] = time.perf_counter() - start
+            self.pages.append(self.page)
+            self.page = None
+
+    def export(self):
+        return {'stages': self.stages, 'pages': self.pages}
+
+    def merge(self, data):
+        for name, totals in data['stages'].items():
+            merged = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytes': 0})
+            for key in merged:
+                merged[key] += totals[key]
+        self.pages.extend(data['pages'])
+
+    def report(self, top=10):
+        lines = [f'{"stage":<16} {"seconds":>10} {"calls":>8} {"bytes":>12}']
+        for name, totals in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f'{name:<16} {totals["seconds"]:>10.4f} {totals["calls"]:>8} {totals["bytes"]:>12}')
+        slowest = sorted(self.pages, key=lambda page: -page['seconds'])[:top]
+        if slowest:
+            lines.append(f'Slowest {len(slowest)} pages:')
+            for page in slowest:
+                lines.append(f'{page["seconds"] * 1000:>10.2f} ms  {page["bytes_in"]:>10} B  {page["source"]}')
+        return '\n'.join(lines)
+
+    def write_json(self, path):
+        dest_dir = os.path.dirname(path)
+        if dest_dir != '':
+            os.makedirs(dest_dir, exist_ok=True)
+        data = {
+            'version': PROFILE_VERSION,
+            'total_seconds': time.perf_counter() - self.started,
+            'stages': self.stages,
+            'pages': sorted(self.pages, key=lambda page: page['source']),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def __repr__(self) -> str:
+        return f'Profiler({len(self.stages)} stages, {len(self.pages)} pages)'
@@ -0,0 +1,307 @@
+import bisect
+import itertools
+import json
+import operator
+import os
+import re
+
+SEARCH_VERSION = 2
+PAGES_NAME = 'pages.json'
+
+token_pattern = re.compile(r'\w+')
+
+
+def tokenize(text):
+    positions = {}
+    for position, match in enumerate(token_pattern.finditer(text.lower())):
+        positions.setdefault(match[0], []).append(position)
+    return positions
+
+
+def shard_key(term, prefix_length=2):
+    return term[:prefix_length]
+
+
+def find_shard(term, keys, prefix_length=2):
+    for length in range(len(term), prefix_length, -1):
+        if term[:length] in keys:
+            return term[:length]
+    return shard_key(term, prefix_length)
+
+
+def encode_postings(pages):
+    rows = []
+    previous = 0
+    for page_id in sorted(pages):
+        positions = pages[page_id]
+        rows.append(f'[{page_id - previous},{",".join(map(str, map(operator.sub, positions, [0, *positions])))}]')
+        previous = page_id
+    return f'[{",".join(rows)}]'
+
+
+def decode_postings(rows):
+    pages = {}
+    page_id = 0
+    for gap, *positions in rows:
+        page_id += gap
+        pages[page_id] = list(itertools.accumulate(positions))
+    return pages
+
+
+class SearchIndex:
+    def __init__(self, prefix_length=2, max_shard_bytes=1 << 16) -> None:
+        self.enabled = False
+        self.prefix_length = prefix_length
+        self.max_shard_bytes = max_shard_bytes
+        self.clear()
+
+    def clear(self):
+        self.pages = {}
+        self.page_terms = {}
+        self.postings = {}
+        self.encoded = {}
+        self.shards = {}
+        self.parts = {}
+        self.part_pages = {}
+        self.next_id = 0
+        self.dirty = set()
+        self.pages_dirty = True
+
+    def load(self, directory):
+        self.clear()
+        try:
+            with open(os.path.join(directory, PAGES_NAME), encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != SEARCH_VERSION or data.get('prefix_length') != self.prefix_length:
+                return
+            for page_id, (url, title, source) in data['pages'].items():
+                self.pages[source] = [int(page_id), url, title]
+                self.page_terms[source] = []
+            self.next_id = data['next_id']
+            sources = {entry[0]: source for source, entry in self.pages.items()}
+            for key in data['shards']:
+                with open(os.path.join(directory, f'{key}.json'), encoding='utf-8') as f:
+                    shard = json.load(f)
+                self.shards[key] = set(shard)
+                for term, rows in shard.items():
+                    pages = decode_postings(rows)
+                    self.postings.setdefault(term, {}).update(pages)
+                    for page_id in pages:
+                        self.page_terms[sources[page_id]].append(term)
+                    if '.' in key:
+                        bisect.insort(self.parts.setdefault(term, []), int(key.rsplit('.', 1)[1]))
+                        self.part_pages[key] = set(pages)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.clear()
+            return
+        self.pages_dirty = False
+
+    def update(self, source, url, title, text):
+        entry = self.pages.get(source)
+        if entry is None:
+            page_id = self.next_id
+            self.next_id += 1
+        else:
+            page_id = entry[0]
+            self._remove_terms(source, page_id)
+        positions = tokenize(text)
+        for term, term_positions in positions.items():
+            self.postings.setdefault(term, {})[page_id] = term_positions
+            key = self._key(term, page_id)
+            self.encoded.pop(key if term in self.parts else term, None)
+            self.shards.setdefault(key, set()).add(term)
+            if term in self.parts:
+                self.part_pages.setdefault(key, set()).add(page_id)
+            self.dirty.add(key)
+        self.page_terms[source] = list(positions)
+        if entry != [page_id, url, title]:
+            self.pages[source] = [page_id, url, title]
+            self.pages_dirty = True
+
+    def remove(self, source):
+        entry = self.pages.pop(source, None)
+        if entry is None:
+            return
+        self._remove_terms(source, entry[0])
+        del self.page_terms[source]
+        self.pages_dirty = True
+
+    def prune(self, live_sources):
+        for source in sorted(set(self.pages) - set(live_sources)):
+            self.remove(source)
+
+    def _key(self, term, page_id):
+        starts = self.parts.get(term)
+        if starts is None:
+            return find_shard(term, self.shards, self.prefix_length)
+        return f'{term}.{starts[max(bisect.bisect_right(starts, page_id) - 1, 0)]}'
+
+    def _remove_terms(self, source, page_id):
+        for term in self.page_terms.get(source, ()):
+            pages = self.postings[term]
+            del pages[page_id]
+            key = self._key(term, page_id)
+            self.encoded.pop(key if term in self.parts else term, None)
+            self.dirty.add(key)
+            if term in self.parts:
+                self.part_pages[key].discard(page_id)
+                if not self.part_pages[key]:
+                    self.shards[key].discard(term)
+            elif not pages:
+                self.shards[key].discard(term)
+            if not pages:
+                del self.postings[term]
+
+    def write(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        done = set()
+        pending = sorted(self.dirty, reverse=True)
+        while pending:
+            key = pending.pop()
+            done.add(key)
+            path = os.path.join(directory, f'{key}.json')
+            terms = self.shards.get(key)
+            if not terms:
+                self._drop(key)
+                if os.path.exists(path):
+                    os.remove(path)
+                    self.pages_dirty = True
+                continue
+            parts = [f'{json.dumps(term, ensure_ascii=False)}:{self._encode(key, term)}' for term in sorted(terms)]
+            size = sum(map(len, parts))
+            if size > self.max_shard_bytes:
+                split = self._split(key, size)
+                if split:
+                    pending.extend(sorted(split | {key}, reverse=True))
+                    continue
+            if not os.path.exists(path):
+                self.pages_dirty = True
+            write_text(path, '{' + ','.join(parts) + '}')
+        if self.pages_dirty:
+            data = {
+                'version': SEARCH_VERSION,
+                'prefix_length': self.prefix_length,
+                'next_id': self.next_id,
+                'shards': sorted(self.shards),
+                'pages': {entry[0]: [entry[1], entry[2], source] for source, entry in sorted(self.pages.items())},
+            }
+            write_json(os.path.join(directory, PAGES_NAME), data)
+        self.dirty = set()
+        self.pages_dirty = False
+        return len(done)
+
+    def _split(self, key, size):
+        terms = self.shards[key]
+        if key not in self.part_pages and terms != {key}:
+            children = set()
+            for term in [term for term in terms if len(term) > len(key)]:
+                terms.discard(term)
+                child = term[: len(key) + 1]
+                self.shards.setdefault(child, set()).add(term)
+                children.add(child)
+            return children
+        (term,) = terms
+        pages = sorted(self.part_pages.get(key, self.postings[term]))
+        if len(pages) < 2:
+            return set()
+        if term in self.parts:
+            first = int(key.rsplit('.', 1)[1])
+            self.parts[term].remove(first)
+            del self.part_pages[key]
+        else:
+            first = 0
+            self.parts[term] = []
+        del self.shards[key]
+        self.encoded.pop(key, None)
+        count = min(len(pages), 2 * size // self.max_shard_bytes + 1)
+        children = set()
+        for i in range(count):
+            chunk = pages[len(pages) * i // count : len(pages) * (i + 1) // count]
+            start = first if i == 0 else chunk[0]
+            child = f'{term}.{start}'
+            bisect.insort(self.parts[term], start)
+            self.part_pages[child] = set(chunk)
+            self.shards[child] = {term}
+            children.add(child)
+        return children
+
+    def _drop(self, key):
+        self.shards.pop(key, None)
+        if self.part_pages.pop(key, None) is None:
+            return
+        term, start = key.rsplit('.', 1)
+        starts = self.parts[term]
+        starts.remove(int(start))
+        if not starts:
+            del self.parts[term]
+
+    def _encode(self, key, term):
+        part = self.part_pages.get(key)
+        encoded = self.encoded.get(term if part is None else key)
+        if encoded is None:
+            pages = self.postings[term]
+            if part is not None:
+                pages = {page_id: pages[page_id] for page_id in part}
+            encoded = self.encoded[term if part is None else key] = encode_postings(pages)
+        return encoded
+
+    def __contains__(self, source) -> bool:
+        return source in self.pages
+
+    def __repr__(self) -> str:
+        return f'SearchIndex({len(self.pages)} pages, {len(self.postings)} terms, {len(self.shards)} shards)'
+
+
+def write_json(path, data):
+    write_text(path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+
+def write_text(path, text):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class SearchReader:
+    def __init__(self, directory) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, PAGES_NAME), encoding='utf-8') as f:
+            data = json.load(f)
+        self.prefix_length = data['prefix_length']
+        self.pages = {int(page_id): (url, title) for page_id, (url, title, _) in data['pages'].items()}
+        self.available = set(data['shards'])
+        self.parts = {}
+        for key in data['shards']:
+            term, _, start = key.rpartition('.')
+            if term:
+                self.parts.setdefault(term, []).append(key)
+        self.loaded = {}
+
+    def postings(self, term):
+        keys = self.parts.get(term) or [find_shard(term, self.available, self.prefix_length)]
+        pages = {}
+        for key in keys:
+            if key not in self.available:
+                continue
+            if key not in self.loaded:
+                with open(os.path.join(self.directory, f'{key}.json'), encoding='utf-8') as f:
+                    self.loaded[key] = json.load(f)
+            pages.update(decode_postings(self.loaded[key].get(term, ())))
+        return pages
+
+    def query(self, text, limit=10):
+        terms = list(tokenize(text))
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            postings = self.postings(term)
+            if scores is None:
+                scores = {page_id: len(positions) for page_id, positions in postings.items()}
+            else:
+                scores = {page_id: score + len(postings[page_id]) for page_id, score in scores.items() if page_id in postings}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self.pages[page_id][0], self.pages[page_id][1], score) for page_id, score in ranked]
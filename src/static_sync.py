@@ -0,0 +1,101 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from fileutils import make_dirs, remove_output
+from manifest import hash_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FICLONE = 0x40049409
+
+sync_modes = ('copy', 'hardlink', 'reflink')
+sync_checks = ('mtime', 'hash')
+
+
+class SyncResult:
+    def __init__(self) -> None:
+        self.copied = []
+        self.skipped = 0
+        self.removed = []
+
+    def __repr__(self) -> str:
+        return f'SyncResult({len(self.copied)} copied, {self.skipped} skipped, {len(self.removed)} removed)'
+
+
+def walk_files(root):
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                else:
+                    yield entry.path, entry.stat()
+
+
+def sync_static(source_dir, dest_dir, manifest, mode='copy', check='mtime', workers=None):
+    if mode not in sync_modes:
+        raise ValueError(f'Unknown sync mode: {mode}')
+    if check not in sync_checks:
+        raise ValueError(f'Unknown sync check: {check}')
+
+    result = SyncResult()
+    seen = set()
+    pending = []
+    for path, stat in walk_files(source_dir):
+        rel = os.path.relpath(path, source_dir).replace(os.sep, '/')
+        seen.add(rel)
+        dest = os.path.join(dest_dir, rel)
+        entry = manifest.static.get(rel)
+        if entry is not None and os.path.exists(dest):
+            if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                result.skipped += 1
+                continue
+            if check == 'hash' and entry['size'] == stat.st_size and entry.get('hash') == hash_file(path):
+                entry['mtime_ns'] = stat.st_mtime_ns
+                result.skipped += 1
+                continue
+        pending.append((rel, path, dest, stat))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(transfer, path, dest, mode, check) for _, path, dest, _ in pending]
+    for (rel, _, _, stat), future in zip(pending, futures):
+        manifest.static[rel] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': future.result()}
+        result.copied.append(rel)
+
+    for rel in sorted(set(manifest.static) - seen):
+        del manifest.static[rel]
+        remove_output(os.path.join(dest_dir, rel), dest_dir)
+        result.removed.append(rel)
+    return result
+
+
+def transfer(source, dest, mode='copy', check='mtime'):
+    make_dirs(os.path.dirname(dest))
+    if os.path.lexists(dest):
+        os.remove(dest)
+    if mode == 'hardlink':
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copy2(source, dest)
+    elif mode == 'reflink':
+        reflink(source, dest)
+    else:
+        shutil.copy2(source, dest)
+    return hash_file(source) if check == 'hash' else None
+
+
+def reflink(source, dest):
+    with open(source, 'rb') as src, open(dest, 'wb') as dst:
+        try:
+            if fcntl is None:
+                raise OSError('reflinks are not supported on this platform')
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            shutil.copyfileobj(src, dst)
+    shutil.copystat(source, dest)
@@ -0,0 +1,134 @@
+import os
+import re
+
+from htmlnode import HTMLNode, unquoted_value_pattern
+
+slot_pattern = re.compile(r'\{\{ (\w+) \}\}')
+markup_pattern = re.compile(r'<!--.*?-->|<(pre|textarea|script|style)\b.*?</\1\s*>|<[^>]*>', re.S | re.I)
+tag_name_pattern = re.compile(r'</?(!doctype|[a-z][\w-]*)', re.I)
+attribute_pattern = re.compile(rf'(\s[\w:.-]+)="({unquoted_value_pattern.pattern})"')
+whitespace_pattern = re.compile(r'\s+')
+
+block_tags = set(
+    '!doctype html head body title meta link base script style noscript div p article section nav header footer '
+    'main aside figure figcaption h1 h2 h3 h4 h5 h6 ul ol li dl dt dd pre blockquote hr table thead tbody tfoot tr '
+    'th td form details summary address'.split()
+)
+
+template_name = 'template.html'
+
+
+class Template:
+    def __init__(self, text, minify=False, assets=None) -> None:
+        self.minify = minify
+        self.segments = []
+        self.slots = []
+        self.inputs = []
+        pos = 0
+        for match in slot_pattern.finditer(text):
+            self.segments.append(text[pos : match.start()])
+            self.slots.append(match[1])
+            pos = match.end()
+        self.segments.append(text[pos:])
+        if assets is not None:
+            self.segments = [assets.rewrite(segment, self.inputs) for segment in self.segments]
+        if minify:
+            last = len(self.segments) - 1
+            self.segments = [minify_html(segment, i == 0, i == last) for i, segment in enumerate(self.segments)]
+
+    def render(self, values):
+        parts = []
+        self.write(parts.append, values)
+        return ''.join(parts)
+
+    def write(self, write, values):
+        write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                write(f'{{{{ {slot} }}}}')
+            elif isinstance(value, HTMLNode):
+                value.write_html(write, self.minify)
+            elif callable(value):
+                value(write)
+            else:
+                write(value)
+            write(segment)
+
+    def __repr__(self) -> str:
+        return f'Template({self.slots})'
+
+
+class TemplateCache:
+    def __init__(self, minify=False, assets=None) -> None:
+        self.templates = {}
+        self.minify = minify
+        self.assets = assets
+
+    def get(self, path):
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size, self.minify, self.assets.digest if self.assets is not None else None)
+        cached = self.templates.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(path, encoding='utf-8') as f:
+            template = Template(f.read(), self.minify, self.assets)
+        self.templates[path] = (key, template)
+        return template
+
+    def clear(self):
+        self.templates.clear()
+
+
+def minify_html(text, at_start=True, at_end=True):
+    items = []
+    pos = 0
+    for match in markup_pattern.finditer(text):
+        _append_text(items, text[pos : match.start()])
+        pos = match.end()
+        markup = match[0]
+        if markup.startswith('<!--'):
+            if markup.startswith('<!--[if'):
+                items.append((markup, None))
+            continue
+        name = tag_name_pattern.match(markup)
+        if match[1] is None:
+            markup = attribute_pattern.sub(r'\1=\2', markup)
+        items.append((markup, name[1].lower() if name else None))
+    _append_text(items, text[pos:])
+
+    parts = []
+    for i, item in enumerate(items):
+        if not isinstance(item, str):
+            parts.append(item[0])
+            continue
+        text = whitespace_pattern.sub(' ', item)
+        before = items[i - 1] if i > 0 else None
+        after = items[i + 1] if i + 1 < len(items) else None
+        if text.startswith(' ') and (at_start if before is None else before[1] in block_tags):
+            text = text[1:]
+        if text.endswith(' ') and (at_end if after is None else after[1] in block_tags):
+            text = text[:-1]
+        parts.append(text)
+    return ''.join(parts)
+
+
+def _append_text(items, text):
+    if not text:
+        return
+    if items and isinstance(items[-1], str):
+        items[-1] += text
+    else:
+        items.append(text)
+
+
+def resolve_template(source_path, content_root, default_path):
+    root = os.path.normpath(content_root)
+    directory = os.path.dirname(source_path)
+    while True:
+        candidate = os.path.join(directory, template_name)
+        if os.path.isfile(candidate):
+            return candidate
+        if os.path.normpath(directory) == root or directory == os.path.dirname(directory):
+            return default_path
+        directory = os.path.dirname(directory)
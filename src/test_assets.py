@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetFingerprints, fingerprint_name
+
+
+class TestAssetFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.static = os.path.join(self.tmp.name, 'static')
+        self.public = os.path.join(self.tmp.name, 'public')
+        self.write('index.css', 'body {}')
+        self.write(os.path.join('images', 'cat.png'), 'meow')
+        self.write('robots.txt', 'User-agent: *')
+        self.assets = AssetFingerprints()
+        self.result = self.assets.process(self.static, self.public)
+
+    def write(self, rel, text):
+        path = os.path.join(self.static, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name('css/site.min.css', 'abcdef0123456789'), 'css/site.min.abcdef0123.css')
+
+    def test_process(self):
+        self.assertEqual(sorted(self.assets.urls), ['/images/cat.png', '/index.css'])
+        self.assertEqual(self.result.hashed, 2)
+        name = self.assets.urls['/index.css'].lstrip('/')
+        with open(os.path.join(self.public, name), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'body {}')
+
+    def test_hashes_are_cached_by_mtime(self):
+        index = os.path.join(self.tmp.name, 'assets.json')
+        self.assets.save(index)
+        reloaded = AssetFingerprints()
+        reloaded.load(index)
+        result = reloaded.process(self.static, self.public)
+        self.assertEqual((result.hashed, result.written, result.removed), (0, [], []))
+        self.assertEqual(reloaded.urls, self.assets.urls)
+        self.assertEqual(reloaded.digest, self.assets.digest)
+
+        old = self.assets.urls['/index.css'].lstrip('/')
+        self.write('index.css', 'body { margin: 0 }')
+        result = reloaded.process(self.static, self.public)
+        self.assertEqual(result.hashed, 1)
+        self.assertEqual(result.removed, [old])
+        self.assertFalse(os.path.exists(os.path.join(self.public, old)))
+        self.assertNotEqual(reloaded.digest, self.assets.digest)
+
+    def test_rewrite(self):
+        inputs = []
+        text = '<link href="/index.css"><script src=\'/app.js\'></script><a href="/index.css?v=1">'
+        css = self.assets.urls['/index.css']
+        self.assertEqual(
+            self.assets.rewrite(text, inputs),
+            f'<link href="{css}"><script src=\'/app.js\'></script><a href="{css}?v=1">',
+        )
+        self.assertEqual(inputs, [os.path.join(self.static, 'index.css')] * 2)
+
+    def test_image_props(self):
+        cat = self.assets.urls['/images/cat.png']
+        props = {'/images/cat.png': {'width': '10', 'srcset': '/images/cat-5w.png 5w, /images/cat.png 10w'}}
+        self.assertEqual(
+            self.assets.image_props(props),
+            {'/images/cat.png': {'width': '10', 'srcset': f'/images/cat-5w.png 5w, {cat} 10w', 'src': cat}},
+        )
+        self.assertNotIn('src', props['/images/cat.png'])
+        self.assertEqual(self.assets.inputs([['a', '/images/cat.png'], ['img', '/images/cat.png']]), [
+            os.path.join(self.static, 'images', 'cat.png')
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache, block_key
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_put_counters(self):
+        cache = BlockCache()
+        key, value = cache.get('# Heading')
+        self.assertIsNone(value)
+        self.assertEqual(key, block_key('# Heading'))
+        cache.put(key, '<h1>Heading</h1>')
+        self.assertEqual(cache.get('# Heading'), (key, '<h1>Heading</h1>'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_variants_use_separate_keys(self):
+        cache = BlockCache()
+        key, _ = cache.get('[a](/a)')
+        cache.put(key, '<a href="/a">a</a>')
+        minified_key, value = cache.get('[a](/a)', 'minify')
+        self.assertIsNone(value)
+        self.assertNotEqual(minified_key, key)
+        self.assertEqual(block_key('[a](/a)'), block_key('[a](/a)', ''))
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(max_entries=2)
+        for block in ['a', 'b']:
+            cache.put(block_key(block), block.upper())
+        cache.get('a')
+        cache.put(block_key('c'), 'C')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('b')[1], None)
+        self.assertEqual(cache.get('a')[1], 'A')
+        self.assertEqual(cache.get('c')[1], 'C')
+
+    def test_new_entries(self):
+        cache = BlockCache()
+        cache.put(block_key('a'), 'A')
+        cache.track_new_entries()
+        cache.put(block_key('b'), 'B')
+        self.assertEqual(cache.take_new_entries(), {block_key('b'): 'B'})
+        other = BlockCache()
+        other.update({block_key('b'): 'B'})
+        self.assertEqual(other.get('b')[1], 'B')
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache', 'blocks.json')
+            cache = BlockCache()
+            cache.put(block_key('a'), 'A')
+            cache.put(block_key('b'), 'B')
+            cache.save(path)
+            loaded = BlockCache(max_entries=1)
+            loaded.load(path)
+            self.assertEqual(len(loaded), 1)
+            self.assertEqual(loaded.get('b')[1], 'B')
+            missing = BlockCache()
+            missing.load(os.path.join(tmp, 'missing.json'))
+            self.assertEqual(len(missing), 0)
+
+    def test_save_skips_clean_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'blocks.json')
+            cache = BlockCache()
+            cache.put(block_key('a'), 'A')
+            cache.save(path)
+            os.utime(path, ns=(0, 0))
+            cache.get('a')
+            cache.save(path)
+            self.assertEqual(os.stat(path).st_mtime_ns, 0)
+            cache.put(block_key('b'), 'B')
+            cache.save(path)
+            self.assertNotEqual(os.stat(path).st_mtime_ns, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
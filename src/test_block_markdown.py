@@ -1,16 +1,24 @@
+import random
 import unittest
 
+from block_cache import BlockCache
+from htmlnode import LeafNode
 from markdown_blocks import (
     block_to_block_type,
     code_type,
     extarct_title,
     heading_type,
+    iter_blocks,
     markdown_to_blocks,
     markdown_to_html_node,
+    node_text,
     ordered_list_type,
+    parse_document,
+    scan_metadata,
     paragraph_type,
     quote_type,
     unordered_list_type,
+    write_blocks,
 )
 
 markdown = """ 
@@ -102,6 +110,98 @@ This is another paragraph with *italic* text and `code` here
         expected = '<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>'
         self.assertEqual(result.to_html(), expected)
 
+    def test_markdown_to_html_node_cache(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+
+    def test_parse_document(self):
+        md = '''
+# Title with `code`
+
+Intro with a [link](/a) and ![alt](/b.png) image.
+
+## Section
+
+* one
+* two **bold**
+'''
+        document = parse_document(md)
+        self.assertEqual(document.title, 'Title with `code`')
+        self.assertEqual(document.description, 'Intro with a link and image.')
+        self.assertEqual(document.outline, [(1, 'Title with code'), (2, 'Section')])
+        self.assertEqual(document.text, 'Title with code\n\nIntro with a link and  image.\n\nSection\n\none\ntwo bold')
+        self.assertEqual(document.word_count, 13)
+        self.assertEqual(document.node.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_parse_document_cached_blocks(self):
+        cache = BlockCache()
+        first = parse_document(markdown, cache)
+        second = parse_document(markdown, cache)
+        self.assertEqual(cache.hits, 4)
+        self.assertEqual(second.node.to_html(), first.node.to_html())
+        self.assertEqual((second.title, second.outline, second.text), (first.title, first.outline, first.text))
+        self.assertTrue(all(isinstance(node, LeafNode) for node in first.node.children))
+
+    def test_parse_document_without_title(self):
+        document = parse_document('### Only h3\n\nText')
+        self.assertIsNone(document.title)
+        self.assertEqual(document.description, 'Text')
+
+    def test_parse_document_links(self):
+        markdown = '# Back [home](/)\n\nSee ![a cat](/cat.png) and [docs](docs.html)\n\n* see [x](https://example.com)'
+        cache = BlockCache()
+        expected = [['a', '/'], ['img', '/cat.png'], ['a', 'docs.html'], ['a', 'https://example.com']]
+        self.assertEqual(parse_document(markdown, cache).links, expected)
+        self.assertEqual(parse_document(markdown, cache).links, expected)
+        self.assertEqual(cache.hits, 3)
+
+    def test_image_props_vary_cache(self):
+        cache = BlockCache()
+        markdown = '# Title\n\n![a cat](/cat.png) and text'
+        self.assertNotIn('width', parse_document(markdown, cache).node.to_html())
+        html = parse_document(markdown, cache, image_props={'/cat.png': {'width': '640'}}).node.to_html()
+        self.assertIn('<img alt="a cat" src="/cat.png" width="640">', html)
+        html = parse_document(markdown, cache, image_props={'/cat.png': {'width': '320'}}).node.to_html()
+        self.assertIn('width="320"', html)
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_node_text(self):
+        node = markdown_to_html_node('1. first\n2. the *second*')
+        self.assertEqual(node_text(node), 'first\nthe second')
+
+    def test_empty_inline_block_raises_value_error(self):
+        for block in ['****', '``']:
+            with self.assertRaisesRegex(ValueError, 'No children provided'):
+                parse_document(f'# Title\n\n{block}').node.to_html()
+            with self.assertRaisesRegex(ValueError, 'No children provided'):
+                parse_document(f'# Title\n\n{block}', BlockCache())
+
+    def test_iter_blocks_matches_markdown_to_blocks(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = ''.join(rng.choice(['a', ' ', '\n', '\n\n', '# h']) for _ in range(rng.randint(0, 20)))
+            cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 4))))
+            chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+            self.assertEqual(list(iter_blocks(chunks)), markdown_to_blocks(text), repr(chunks))
+
+    def test_write_blocks(self):
+        parts = []
+        write_blocks(iter_blocks([markdown]), parts.append)
+        self.assertEqual(''.join(parts), markdown_to_html_node(markdown).to_html())
+        with self.assertRaises(ValueError):
+            write_blocks(iter_blocks(['\n\n']), parts.append)
+
+    def test_scan_metadata(self):
+        self.assertEqual(
+            scan_metadata(markdown_to_blocks(markdown)),
+            ('This is a heading', 'This is a paragraph of text. It has some bold and italic words inside of it.'),
+        )
+        self.assertEqual(scan_metadata(['## h2', 'text']), (None, 'text'))
+
     def test_extract_title(self):
         result = extarct_title(markdown)
         assert result == 'This is a heading'
@@ -0,0 +1,79 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import compress
+from compress import compress_encodings, compress_site
+from manifest import Manifest
+
+
+class TestCompressSite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.write('index.html', '<p>hello</p>' * 100)
+        self.write(os.path.join('css', 'site.css'), 'body { color: red; }\n' * 50)
+        self.write('logo.png', 'not text')
+        self.manifest = Manifest()
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_writes_gzip_siblings(self):
+        result = compress_site(self.root, self.manifest, encodings=('.gz',))
+        self.assertEqual(sorted(result.compressed), [self.path('css', 'site.css.gz'), self.path('index.html.gz')])
+        with gzip.open(self.path('index.html.gz'), 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '<p>hello</p>' * 100)
+        self.assertFalse(os.path.exists(self.path('logo.png.gz')))
+        self.assertEqual(os.stat(self.path('index.html.gz')).st_mtime_ns, os.stat(self.path('index.html')).st_mtime_ns)
+
+    def test_skips_up_to_date_files(self):
+        compress_site(self.root, self.manifest, encodings=('.gz',))
+        os.utime(self.path('index.html'), ns=(0, 10**18))
+        result = compress_site(self.root, self.manifest, encodings=('.gz',))
+        self.assertEqual(result.compressed, [self.path('index.html.gz')])
+        self.assertEqual(result.skipped, 1)
+
+    def test_removes_orphans(self):
+        compress_site(self.root, self.manifest, encodings=('.gz',))
+        os.remove(self.path('css', 'site.css'))
+        result = compress_site(self.root, self.manifest, encodings=('.gz',))
+        self.assertEqual(result.removed, [self.path('css', 'site.css.gz')])
+        self.assertFalse(os.path.exists(self.path('css')))
+        self.assertEqual(self.manifest.compressed, ['index.html.gz'])
+
+    def test_keeps_compressed_files_it_did_not_write(self):
+        self.write(os.path.join('downloads', 'archive.tar.gz'), 'archive')
+        self.write(os.path.join('downloads', 'data.json.gz'), 'data')
+        compress_site(self.root, self.manifest, encodings=('.gz',))
+        os.remove(self.path('index.html'))
+        result = compress_site(self.root, self.manifest, encodings=('.gz',))
+        self.assertEqual(result.removed, [self.path('index.html.gz')])
+        self.assertTrue(os.path.exists(self.path('downloads', 'archive.tar.gz')))
+        self.assertTrue(os.path.exists(self.path('downloads', 'data.json.gz')))
+
+    def test_parallel(self):
+        for i in range(10):
+            self.write(f'page-{i}.html', f'<p>{i}</p>')
+        result = compress_site(self.root, self.manifest, jobs=2, encodings=('.gz',))
+        self.assertEqual(len(result.compressed), 12)
+        with gzip.open(self.path('page-7.html.gz'), 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '<p>7</p>')
+
+    def test_encodings_without_brotli(self):
+        with mock.patch.object(compress, 'brotli', None):
+            self.assertEqual(compress_encodings(), ('.gz',))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import main
+from config import BuildConfig
+from daemon import BuildDaemon, send_request, start_daemon_server
+
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.write(os.path.join(self.root, 'template.html'), '<title>{{ Title }}</title>{{ Content }}')
+        self.write(os.path.join(self.root, 'content', 'index.md'), '# Home\n\nWelcome')
+        self.write(os.path.join(self.root, 'content', 'blog', 'index.md'), '# Blog\n\nPosts')
+        self.write(os.path.join(self.root, 'static', 'index.css'), 'body {}')
+        self.daemon = BuildDaemon(main.build, main.parse_config, self.root)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def request(self, **options):
+        return {'command': 'build', 'config': dict(root=self.root, incremental=True, **options)}
+
+    def test_warm_incremental_builds(self):
+        first = self.daemon.handle(self.request())
+        self.assertTrue(first['ok'], first)
+        self.assertEqual((first['rendered'], first['skipped']), (2, 0))
+        manifest = self.daemon.manifest
+        self.assertIsNotNone(manifest)
+
+        self.write(os.path.join(self.root, 'content', 'blog', 'index.md'), '# Blog\n\nNew post')
+        second = self.daemon.handle(self.request())
+        self.assertEqual((second['rendered'], second['skipped']), (1, 1))
+        self.assertIs(self.daemon.manifest, manifest)
+        self.assertIn('Generation page', second['output'])
+
+    def test_manifest_change_drops_warm_state(self):
+        self.daemon.handle(self.request())
+        manifest = self.daemon.manifest
+        self.assertIs(self.daemon.warm_manifest(BuildConfig(root=self.root, incremental=True)), manifest)
+        self.assertIsNone(self.daemon.warm_manifest(BuildConfig(root=self.root, incremental=True, minify=True)))
+        os.utime(BuildConfig(root=self.root).manifest_path, ns=(0, 0))
+        self.assertIsNone(self.daemon.warm_manifest(BuildConfig(root=self.root, incremental=True)))
+
+    def test_rejects_paths_outside_root(self):
+        response = self.daemon.handle(self.request(public_path=os.path.dirname(self.root)))
+        self.assertFalse(response['ok'])
+        self.assertIn('public_path must be inside', response['error'])
+        outside = os.path.join(os.path.dirname(self.root), 'profile.json')
+        response = self.daemon.handle(self.request(profile=outside))
+        self.assertIn('profile must be inside', response['error'])
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.root)
+        response = self.daemon.handle({'argv': ['--profile', '--profile-output', outside]})
+        self.assertIn('profile must be inside', response['error'])
+        self.assertFalse(os.path.exists(outside))
+
+    def test_invalid_requests(self):
+        self.assertFalse(self.daemon.handle(['build'])['ok'])
+        self.assertFalse(self.daemon.handle({'command': 'deploy'})['ok'])
+        self.assertIn('Unknown build options', self.daemon.handle({'config': {'colour': True}})['error'])
+        self.assertEqual(self.daemon.handle({'argv': ['--jobs', 'x']})['error'], 'Invalid build arguments')
+        self.assertIn('cannot run inside the daemon', self.daemon.handle({'argv': ['serve']})['error'])
+
+    def test_socket_round_trip(self):
+        address = os.path.join(self.root, '.build-cache', 'daemon.sock')
+        server = start_daemon_server(address, self.daemon)
+        self.addCleanup(server.server_close)
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+        response = send_request(address, {'command': 'ping'}, timeout=5)
+        thread.join()
+        self.assertEqual((response['ok'], response['pid'], response['builds']), (True, os.getpid(), 0))
+        self.assertEqual(os.stat(address).st_mode & 0o777, 0o600)
+        with self.assertRaises(RuntimeError):
+            thread = threading.Thread(target=server.handle_request)
+            thread.start()
+            try:
+                start_daemon_server(address, self.daemon)
+            finally:
+                thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from depgraph import DependencyGraph
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.record('a.md', {'a.md': '1', 'template.html': 't'})
+        self.graph.record('b.md', {'b.md': '2', 'template.html': 't', 'snippet.md': 's'})
+        self.graph.record('c.md', {'c.md': '3', 'blog/template.html': 'u'})
+
+    def test_affected(self):
+        self.assertEqual(self.graph.affected(['snippet.md']), {'b.md': ['snippet.md']})
+        self.assertEqual(
+            self.graph.affected(['template.html', 'b.md']),
+            {'a.md': ['template.html'], 'b.md': ['b.md', 'template.html']},
+        )
+        self.assertEqual(self.graph.affected(['unknown.md']), {})
+
+    def test_record_replaces_inputs(self):
+        self.graph.record('b.md', {'b.md': '2', 'template.html': 't'})
+        self.assertEqual(self.graph.affected(['snippet.md']), {})
+        self.assertNotIn('snippet.md', self.graph.dependents)
+
+    def test_remove(self):
+        self.graph.remove('c.md')
+        self.assertEqual(self.graph.affected(['blog/template.html', 'c.md']), {})
+        self.assertNotIn('c.md', self.graph.inputs)
+
+    def test_changed_inputs(self):
+        hashes = {'b.md': '2', 'template.html': 't', 'snippet.md': 'changed'}
+        self.assertEqual(self.graph.changed_inputs('b.md', hashes.get), ['snippet.md'])
+        self.assertEqual(self.graph.changed_inputs('missing.md', hashes.get), [])
+
+    def test_rebuilds_dependents_from_inputs(self):
+        graph = DependencyGraph(self.graph.inputs)
+        self.assertEqual(graph.dependents, self.graph.dependents)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+from devserver import LiveReload, Watcher, inject_livereload, livereload_script, start_server
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_inject_livereload(self):
+        self.assertEqual(
+            inject_livereload('<body><p>x</p></body></html>'),
+            f'<body><p>x</p>{livereload_script}</body></html>',
+        )
+        self.assertEqual(inject_livereload('<p>x</p>'), f'<p>x</p>{livereload_script}')
+
+    def test_wait_returns_new_generation(self):
+        livereload = LiveReload()
+        threading.Timer(0.01, livereload.notify).start()
+        self.assertEqual(livereload.wait(0, timeout=5), 1)
+        self.assertEqual(livereload.wait(1, timeout=0.01), 1)
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.page = os.path.join(self.tmp.name, 'content', 'index.md')
+        self.write(self.page, '# Home')
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_poll(self):
+        template = os.path.join(self.tmp.name, 'template.html')
+        self.write(template, '{{ Content }}')
+        watcher = Watcher([os.path.join(self.tmp.name, 'content'), template])
+        self.assertEqual(watcher.poll(), ([], []))
+
+        self.write(self.page, '# Home page')
+        new_page = os.path.join(self.tmp.name, 'content', 'blog', 'post.md')
+        self.write(new_page, '# Post')
+        self.assertEqual(watcher.poll(), (sorted([self.page, new_page]), []))
+
+        os.remove(new_page)
+        self.write(template, '<main>{{ Content }}</main>')
+        self.assertEqual(watcher.poll(), ([template], [new_page]))
+
+
+class TestDevServer(unittest.TestCase):
+    def test_serves_html_with_livereload(self):
+        with tempfile.TemporaryDirectory() as public:
+            with open(os.path.join(public, 'index.html'), 'w', encoding='utf-8') as f:
+                f.write('<body>home</body>')
+            with open(os.path.join(public, 'index.css'), 'w', encoding='utf-8') as f:
+                f.write('body {}')
+            server = start_server(public, 0, LiveReload())
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+            base = f'http://127.0.0.1:{server.server_address[1]}'
+            with urllib.request.urlopen(f'{base}/') as response:
+                self.assertEqual(response.read().decode(), f'<body>home{livereload_script}</body>')
+            with urllib.request.urlopen(f'{base}/index.css') as response:
+                self.assertEqual(response.read(), b'body {}')
+
+
+if __name__ == '__main__':
+    unittest.main()
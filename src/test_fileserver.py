@@ -0,0 +1,140 @@
+import gzip
+import http.client
+import os
+import tempfile
+import unittest
+
+from fileserver import FileCache, accepted_encodings, cache_control, start_file_server
+
+
+class TestFileCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = []
+            for name in 'abc':
+                path = os.path.join(root, name)
+                with open(path, 'wb') as f:
+                    f.write(name.encode() * 40)
+                paths.append(path)
+            cache = FileCache(max_bytes=100)
+            for path in paths[:2]:
+                cache.get(path, os.stat(path))
+            cache.get(paths[0], os.stat(paths[0]))
+            cache.get(paths[2], os.stat(paths[2]))
+            self.assertEqual(list(cache.entries), [paths[0], paths[2]])
+            self.assertEqual((cache.hits, cache.misses, cache.size), (1, 3, 80))
+
+    def test_reloads_changed_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'a')
+            with open(path, 'wb') as f:
+                f.write(b'old')
+            cache = FileCache()
+            self.assertEqual(cache.get(path, os.stat(path)), b'old')
+            with open(path, 'wb') as f:
+                f.write(b'newer')
+            self.assertEqual(cache.get(path, os.stat(path)), b'newer')
+            self.assertEqual(len(cache), 1)
+
+
+class TestAcceptedEncodings(unittest.TestCase):
+    def test_quality_values(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br;q=0'), {'gzip', 'deflate'})
+        self.assertEqual(accepted_encodings('br;q=0.5, gzip;q=1.0'), {'br', 'gzip'})
+        self.assertEqual(accepted_encodings(''), {''})
+
+
+class TestCacheControl(unittest.TestCase):
+    def test_fingerprinted_assets_are_immutable(self):
+        self.assertEqual(cache_control('public/index.html'), 'no-cache')
+        self.assertEqual(cache_control('public/index.css'), 'public, max-age=3600')
+        self.assertEqual(cache_control('public/index.0123456789.css'), 'public, max-age=31536000, immutable')
+        self.assertEqual(cache_control('public/index.012345678g.css'), 'public, max-age=3600')
+
+
+class TestFileServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.html = self.write('index.html', b'<p>home</p>' * 20)
+        self.write(os.path.join('blog', 'index.html'), b'<p>blog</p>')
+        self.large = self.write(os.path.join('images', 'big.png'), bytes(range(256)) * 64)
+        with open(self.html + '.gz', 'wb') as f:
+            f.write(gzip.compress(b'<p>home</p>' * 20))
+        stat = os.stat(self.html)
+        os.utime(self.html + '.gz', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.cache = FileCache(max_file_size=4096)
+        self.server = start_file_server(self.root, 0, self.cache)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def request(self, path, headers=None, method='GET'):
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=5)
+        self.addCleanup(connection.close)
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        return response, response.read()
+
+    def test_serves_files_with_caching_headers(self):
+        response, body = self.request('/')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b'<p>home</p>' * 20)
+        self.assertEqual(response.getheader('Content-Type'), 'text/html; charset=utf-8')
+        self.assertEqual(response.getheader('Cache-Control'), 'no-cache')
+        self.assertTrue(response.getheader('ETag').startswith('"'))
+        response, _ = self.request('/images/big.png')
+        self.assertEqual(response.getheader('Cache-Control'), 'public, max-age=3600')
+
+    def test_conditional_requests(self):
+        response, _ = self.request('/index.html')
+        etag = response.getheader('ETag')
+        response, body = self.request('/index.html', {'If-None-Match': etag})
+        self.assertEqual((response.status, body), (304, b''))
+        self.assertEqual(response.getheader('ETag'), etag)
+        response, _ = self.request('/index.html', {'If-None-Match': '"other"'})
+        self.assertEqual(response.status, 200)
+        response, _ = self.request('/index.html', {'If-Modified-Since': response.getheader('Last-Modified')})
+        self.assertEqual(response.status, 304)
+
+    def test_negotiates_precompressed_variants(self):
+        response, body = self.request('/index.html', {'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertEqual(response.getheader('Vary'), 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(body), b'<p>home</p>' * 20)
+        plain, _ = self.request('/index.html')
+        self.assertNotEqual(response.getheader('ETag'), plain.getheader('ETag'))
+        os.utime(self.html, ns=(0, 10**18))
+        response, body = self.request('/index.html', {'Accept-Encoding': 'gzip'})
+        self.assertIsNone(response.getheader('Content-Encoding'))
+
+    def test_large_files_are_not_cached(self):
+        response, body = self.request('/images/big.png')
+        self.assertEqual(body, bytes(range(256)) * 64)
+        self.assertEqual(response.getheader('Content-Type'), 'image/png')
+        self.assertNotIn(self.large, self.cache.entries)
+        self.request('/')
+        self.request('/')
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_head_redirect_and_missing(self):
+        response, body = self.request('/index.html', method='HEAD')
+        self.assertEqual((response.status, body), (200, b''))
+        self.assertEqual(response.getheader('Content-Length'), str(len(b'<p>home</p>' * 20)))
+        response, _ = self.request('/blog')
+        self.assertEqual((response.status, response.getheader('Location')), (301, '/blog/'))
+        response, _ = self.request('/missing.html')
+        self.assertEqual(response.status, 404)
+        response, _ = self.request('/../../etc/passwd')
+        self.assertEqual(response.status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
@@ -12,6 +13,20 @@ class TestHTMLNode(unittest.TestCase):
         expected = ' href="https://www.google.com" target="_blank"'
         self.assertEqual(propis_text, expected)
 
+    def test_props_to_html_minify(self):
+        props = {'href': '/blog/', 'src': '/a.png', 'alt': 'two words', 'title': 'a=b', 'data-x': ''}
+        node = HTMLNode(tag='a', props=props)
+        self.assertEqual(node.props_to_html(minify=True), ' href="/blog/" src=/a.png alt="two words" title="a=b" data-x=""')
+
+    def test_minified_to_html(self):
+        node = ParentNode('p', [LeafNode('a', 'home', {'href': '/index.html'}), LeafNode(None, ' text')])
+        self.assertEqual(node.to_html(minify=True), '<p><a href=/index.html>home</a> text</p>')
+        self.assertEqual(node.to_html(), '<p><a href="/index.html">home</a> text</p>')
+
+    def test_slots(self):
+        for node in [HTMLNode('p'), LeafNode('b', 'x'), ParentNode('p', [LeafNode('b', 'x')])]:
+            self.assertFalse(hasattr(node, '__dict__'))
+
     def test_empty_props_to_html(self):
         node = HTMLNode(tag='a', value='a text')
         result = node.props_to_html()
@@ -127,6 +142,37 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             node.to_html()
 
+    def test_write_html_streams_fragments(self):
+        node = ParentNode(
+            tag='div',
+            children=[
+                ParentNode(tag='p', children=[LeafNode(tag='b', value='Bold'), LeafNode(value=' text')]),
+                LeafNode(tag='a', value='link', props={'href': '/a', 'target': '_blank'}),
+            ],
+            props={'class': 'page'},
+        )
+        parts = []
+        node.write_html(parts.append)
+        self.assertGreater(len(parts), 1)
+        self.assertEqual(''.join(parts), node.to_html())
+        out = io.StringIO()
+        node.write_html(out.write)
+        self.assertEqual(
+            out.getvalue(),
+            '<div class="page"><p><b>Bold</b> text</p><a href="/a" target="_blank">link</a></div>',
+        )
+
+    def test_write_html_no_children(self):
+        with self.assertRaises(ValueError):
+            ParentNode(tag='p').write_html(io.StringIO().write)
+
+    def test_deeply_nested_to_html(self):
+        depth = 5000
+        node = LeafNode(tag='b', value='deep')
+        for _ in range(depth):
+            node = ParentNode(tag='div', children=[node, LeafNode(value='.')])
+        self.assertEqual(node.to_html(), '<div>' * depth + '<b>deep</b>' + '.</div>' * depth)
+
 
 if __name__ == '__main__':
     unittest.main()
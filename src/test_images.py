@@ -0,0 +1,129 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from images import ImagePipeline, image_size
+
+
+def fake_resize(task):
+    source, dest, width, height = task
+    with open(dest, 'w', encoding='utf-8') as f:
+        f.write(f'{os.path.basename(source)} {width}x{height}')
+
+
+def corrupt_resize(task):
+    if task[2] == 960:
+        with open(f'{task[1]}.tmp', 'w', encoding='utf-8') as f:
+            f.write('partial')
+        raise OSError('image file is truncated')
+    fake_resize(task)
+
+
+def png(width, height):
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', width, height) + b'\x08\x06\x00\x00\x00'
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def size(self, data):
+        path = os.path.join(self.tmp.name, 'image')
+        with open(path, 'wb') as f:
+            f.write(data)
+        return image_size(path)
+
+    def test_formats(self):
+        self.assertEqual(self.size(png(1344, 896)), (1344, 896))
+        self.assertEqual(self.size(b'GIF89a' + struct.pack('<HH', 10, 20) + b'\x00' * 8), (10, 20))
+        jpeg = b'\xff\xd8\xff\xe0' + struct.pack('>H', 6) + b'JFIF' + b'\xff\xc0' + struct.pack('>HBHH', 11, 8, 600, 800)
+        self.assertEqual(self.size(jpeg + b'\x00' * 8), (800, 600))
+        vp8x = b'RIFF\x00\x00\x00\x00WEBPVP8X' + b'\x0a\x00\x00\x00' + b'\x00' * 4
+        self.assertEqual(self.size(vp8x + (1023).to_bytes(3, 'little') + (767).to_bytes(3, 'little') + b'\x00' * 2), (1024, 768))
+        bits = 99 | (49 << 14)
+        vp8l = b'RIFF\x00\x00\x00\x00WEBPVP8L' + b'\x00' * 4 + b'\x2f' + bits.to_bytes(4, 'little') + b'\x00' * 7
+        self.assertEqual(self.size(vp8l), (100, 50))
+
+    def test_unknown(self):
+        self.assertIsNone(self.size(b'<svg xmlns="http://www.w3.org/2000/svg"/>'))
+        self.assertIsNone(self.size(b'\xff\xd8\xff'))
+
+
+class TestImagePipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.static = os.path.join(self.tmp.name, 'static')
+        self.public = os.path.join(self.tmp.name, 'public')
+        self.cache = os.path.join(self.tmp.name, 'cache')
+        os.makedirs(os.path.join(self.static, 'images'))
+        self.write('images/big.png', png(1344, 896))
+        self.write('images/small.png', png(300, 200))
+        self.write('index.css', b'body {}')
+
+    def write(self, rel, data):
+        with open(os.path.join(self.static, rel), 'wb') as f:
+            f.write(data)
+
+    def test_variants_and_props(self):
+        pipeline = ImagePipeline((480, 960, 1600), resize=fake_resize)
+        result = pipeline.process(self.static, self.public, self.cache)
+        self.assertEqual(len(result.generated), 2)
+        with open(os.path.join(self.public, 'images', 'big-480w.png'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'big.png 480x320')
+        self.assertEqual(
+            pipeline.props['/images/big.png']['srcset'],
+            '/images/big-480w.png 480w, /images/big-960w.png 960w, /images/big.png 1344w',
+        )
+        self.assertEqual(
+            pipeline.props['/images/small.png'],
+            {'width': '300', 'height': '200', 'loading': 'lazy', 'decoding': 'async'},
+        )
+        self.assertEqual(pipeline.inputs([['img', '/images/big.png'], ['a', '/images/small.png'], ['img', '/x.png']]), [
+            os.path.join(self.static, 'images', 'big.png')
+        ])
+
+    def test_derivatives_are_cached_by_content(self):
+        index = os.path.join(self.tmp.name, 'images.json')
+        pipeline = ImagePipeline((480,), resize=fake_resize)
+        pipeline.process(self.static, self.public, self.cache)
+        pipeline.save(index)
+
+        os.remove(os.path.join(self.public, 'images', 'big-480w.png'))
+        os.rename(os.path.join(self.static, 'images', 'big.png'), os.path.join(self.static, 'images', 'moved.png'))
+        reloaded = ImagePipeline((480,), resize=fake_resize)
+        reloaded.load(index)
+        result = reloaded.process(self.static, self.public, self.cache)
+        self.assertEqual((result.generated, result.reused), ([], 1))
+        self.assertTrue(os.path.exists(os.path.join(self.public, 'images', 'moved-480w.png')))
+        self.assertEqual(result.removed, ['images/big-480w.png'])
+
+        self.write('images/moved.png', png(2000, 1000))
+        result = reloaded.process(self.static, self.public, self.cache)
+        self.assertEqual(len(result.generated), 1)
+        self.assertEqual(reloaded.props['/images/moved.png']['height'], '1000')
+
+    def test_resize_errors_are_reported_per_image(self):
+        for jobs in [1, 2]:
+            pipeline = ImagePipeline((480, 960), resize=corrupt_resize)
+            cache = os.path.join(self.cache, str(jobs))
+            result = pipeline.process(self.static, self.public, cache, jobs)
+            self.assertEqual(result.errors, [('images/big.png', 'OSError: image file is truncated')])
+            self.assertEqual(len(result.generated), 1)
+            self.assertEqual(pipeline.props['/images/big.png']['srcset'], '/images/big-480w.png 480w, /images/big.png 1344w')
+            self.assertFalse(os.path.exists(os.path.join(self.public, 'images', 'big-960w.png')))
+            self.assertEqual([name for name in os.listdir(cache) if name.endswith('.tmp')], [])
+
+    def test_without_resizer(self):
+        pipeline = ImagePipeline(resize=None)
+        pipeline.resize = None
+        result = pipeline.process(self.static, self.public, self.cache)
+        self.assertEqual(result.generated, [])
+        self.assertNotIn('srcset', pipeline.props['/images/big.png'])
+        self.assertEqual(pipeline.props['/images/big.png']['width'], '1344')
+
+
+if __name__ == '__main__':
+    unittest.main()
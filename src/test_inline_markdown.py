@@ -1,6 +1,7 @@
+import time
 import unittest
 
-from inline_markdown import extract_markdown_images, extract_markdown_links
+from inline_markdown import extract_markdown_images, extract_markdown_links, iter_markdown_images, iter_markdown_links
 
 
 class TestInlineMarkdown(unittest.TestCase):
@@ -27,3 +28,37 @@ class TestInlineMarkdown(unittest.TestCase):
             ("another", "https://www.example.com/another"),
         ]
         self.assertListEqual(result, expected)
+
+    def test_iter_markdown_images_spans(self):
+        text = 'See ![cat](/cat.png) and ![dog](/dog.png).'
+        spans = list(iter_markdown_images(text))
+        self.assertListEqual(spans, [(4, 20, 'cat', '/cat.png'), (25, 41, 'dog', '/dog.png')])
+        self.assertEqual(text[spans[0][0] : spans[0][1]], '![cat](/cat.png)')
+
+    def test_iter_markdown_links_skips_images(self):
+        text = '![img](/a.png) [link](/b)'
+        self.assertListEqual(list(iter_markdown_links(text)), [(15, 25, 'link', '/b')])
+        self.assertListEqual(list(iter_markdown_links(text, 1)), [(15, 25, 'link', '/b')])
+
+    def test_iter_markdown_links_bounds(self):
+        text = '[a](/a) [b](/b)'
+        self.assertListEqual(list(iter_markdown_links(text, 1)), [(8, 15, 'b', '/b')])
+        self.assertListEqual(list(iter_markdown_links(text, 0, 14)), [(0, 7, 'a', '/a')])
+
+    def test_extract_lazy_semantics(self):
+        self.assertListEqual(extract_markdown_links('[a](b) c) [d]x](e)'), [('a', 'b'), ('d]x', 'e')])
+        self.assertListEqual(extract_markdown_links('[a\n](b) [c](d\n)'), [])
+        self.assertListEqual(extract_markdown_images('![[a](b)'), [('[a', 'b')])
+
+    def test_adversarial_input_is_linear(self):
+        def elapsed(text):
+            start = time.perf_counter()
+            extract_markdown_images(text)
+            extract_markdown_links(text)
+            return time.perf_counter() - start
+
+        for unit in ('![', '[a](', '![a](', '[](', ']('):
+            small = min(elapsed(unit * 5000) for _ in range(3))
+            large = min(elapsed(unit * 80000) for _ in range(3))
+            self.assertLess(large, 0.5, unit)
+            self.assertLess(large, max(small, 1e-4) * 64, unit)
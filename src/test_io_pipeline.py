@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+
+from io_pipeline import IOPipeline
+
+
+class TestIOPipeline(unittest.TestCase):
+    def test_results_keep_item_order(self):
+        written = []
+
+        def read(item):
+            time.sleep(0.001 * (item % 3))
+            return item * 10
+
+        def write(item, output):
+            written.append(item)
+            return output + 1
+
+        results = IOPipeline(threads=4).run(range(20), read, lambda item, data: data + item, write)
+        self.assertEqual(results, [(None, item * 11 + 1) for item in range(20)])
+        self.assertEqual(sorted(written), list(range(20)))
+
+    def test_errors_are_reported_per_item(self):
+        def read(item):
+            if item == 1:
+                raise FileNotFoundError(item)
+            return item
+
+        def process(item, data):
+            if item == 2:
+                raise ValueError('bad page')
+            return data
+
+        def write(item, output):
+            if item == 3:
+                raise OSError('disk full')
+            return output
+
+        results = IOPipeline(threads=2).run(range(5), read, process, write)
+        outcomes = [type(error).__name__ if error else value for error, value in results]
+        self.assertEqual(outcomes, [0, 'FileNotFoundError', 'ValueError', 'OSError', 4])
+
+    def test_prefetch_is_bounded(self):
+        lock = threading.Lock()
+        started = []
+        first_process = []
+
+        def read(item):
+            with lock:
+                started.append(item)
+            return item
+
+        def process(item, data):
+            if not first_process:
+                time.sleep(0.05)
+                with lock:
+                    first_process.append(len(started))
+            return data
+
+        pipeline = IOPipeline(threads=4, prefetch=3, write_behind=2)
+        results = pipeline.run(range(50), read, process, lambda item, output: output)
+        self.assertEqual([value for _, value in results], list(range(50)))
+        self.assertLessEqual(first_process[0], pipeline.prefetch + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
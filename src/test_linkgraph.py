@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from linkgraph import FEED_NAME, SITEMAP_NAME, LinkGraph, SiteLinks, resolve_link
+
+
+class TestResolveLink(unittest.TestCase):
+    def test_internal_links(self):
+        self.assertEqual(resolve_link('/blog/', 'post.html'), '/blog/post.html')
+        self.assertEqual(resolve_link('/blog/post.html', '../about.html#team'), '/about.html')
+        self.assertEqual(resolve_link('/blog/post.html', '/docs/index.html?x=1'), '/docs/')
+        self.assertEqual(resolve_link('/', 'my%20page.html'), '/my page.html')
+
+    def test_external_links(self):
+        for href in ['https://example.com/', '//cdn.example.com/a.js', 'mailto:me@example.com', '#top', '']:
+            self.assertIsNone(resolve_link('/', href))
+
+
+class TestLinkGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = LinkGraph()
+        self.graph.add('index.md', '/', 'Home', 0, [['a', 'blog'], ['a', 'https://example.com'], ['img', '/cat.png']])
+        self.graph.add('blog/index.md', '/blog/', 'Blog', 86400, [['a', 'post.html'], ['a', '/'], ['a', '/missing.html']])
+        self.graph.add('blog/post.md', '/blog/post.html', 'Post', 172800, [['a', './'], ['a', 'post.html'], ['img', '/dog.png']])
+
+    def test_broken(self):
+        self.assertEqual(
+            self.graph.broken(lambda target: target == '/cat.png'),
+            [('blog/index.md', '/missing.html'), ('blog/post.md', '/dog.png')],
+        )
+
+    def test_backlinks(self):
+        self.assertEqual(
+            self.graph.backlinks(),
+            {'/': ['/blog/'], '/blog/': ['/', '/blog/post.html'], '/blog/post.html': ['/blog/']},
+        )
+
+    def test_sitemaps(self):
+        sitemap = self.graph.sitemaps('https://example.com')[SITEMAP_NAME]
+        self.assertIn('<url><loc>https://example.com/blog/</loc><lastmod>', sitemap)
+        self.assertEqual(sitemap.count('<url>'), 3)
+        files = self.graph.sitemaps('https://example.com', limit=2)
+        self.assertEqual(sorted(files), ['sitemap-1.xml', 'sitemap-2.xml', SITEMAP_NAME])
+        self.assertIn('<sitemap><loc>https://example.com/sitemap-2.xml</loc></sitemap>', files[SITEMAP_NAME])
+        self.assertEqual(files['sitemap-2.xml'].count('<url>'), 1)
+
+    def test_feed(self):
+        feed = self.graph.feed('https://example.com', limit=2)
+        self.assertIn('<title>Home</title>', feed)
+        self.assertIn('<updated>1970-01-03T00:00:00+00:00</updated>', feed)
+        self.assertEqual(feed.count('<entry>'), 2)
+        self.assertLess(feed.index('/blog/post.html'), feed.index('<id>https://example.com/blog/</id>'))
+
+    def test_site_links_write(self):
+        with tempfile.TemporaryDirectory() as public:
+            self.assertEqual(SiteLinks().write(self.graph, public), [])
+            self.assertEqual(
+                SiteLinks('https://example.com/', backlinks=True).write(self.graph, public),
+                [SITEMAP_NAME, FEED_NAME, 'backlinks.json'],
+            )
+            with open(os.path.join(public, SITEMAP_NAME), encoding='utf-8') as f:
+                self.assertIn('<loc>https://example.com/</loc>', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
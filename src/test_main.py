@@ -0,0 +1,511 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from unittest import mock
+
+import main
+from config import BuildConfig
+from main import STREAM_THRESHOLD, apply_changes, build_pages, discover_pages, page_nav, page_url, remove_tree, split_batches
+from manifest import Manifest
+from search_index import SearchReader
+
+template = '<title>{{ Title }}</title><main>{{ Content }}</main>'
+
+
+class BuildTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = os.path.join(self.tmp.name, 'content')
+        self.public = os.path.join(self.tmp.name, 'public')
+        self.template = os.path.join(self.tmp.name, 'template.html')
+        self.write(self.template, template)
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nWelcome')
+        self.write(os.path.join(self.content, 'blog', 'index.md'), '# Blog\n\nPosts')
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts), encoding='utf-8') as f:
+            return f.read()
+
+    def build(self, manifest, incremental=True, jobs=1):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = build_pages(self.content, self.template, self.public, manifest, incremental, jobs)
+        return result.rendered, result.skipped, result.removed
+
+    def explain(self, manifest):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            build_pages(self.content, self.template, self.public, manifest, True, explain=True)
+        return [line for line in out.getvalue().splitlines() if line.startswith('Rebuild ')]
+
+
+class TestBuildPages(BuildTestCase):
+    def test_full_build(self):
+        rendered, skipped, removed = self.build(Manifest(), incremental=False)
+        self.assertEqual((rendered, skipped, removed), (2, 0, []))
+        self.assertEqual(self.read('index.html'), '<title>Home</title><main><div><h1>Home</h1><p>Welcome</p></div></main>')
+        self.assertEqual(self.read('blog', 'index.html'), '<title>Blog</title><main><div><h1>Blog</h1><p>Posts</p></div></main>')
+
+    def test_incremental_skips_unchanged(self):
+        manifest = Manifest()
+        self.build(manifest)
+        self.write(os.path.join(self.content, 'blog', 'index.md'), '# Blog\n\nNew post')
+        rendered, skipped, removed = self.build(manifest)
+        self.assertEqual((rendered, skipped, removed), (1, 1, []))
+        self.assertIn('New post', self.read('blog', 'index.html'))
+
+    def test_incremental_template_change(self):
+        manifest = Manifest()
+        self.build(manifest)
+        self.write(self.template, '<h1>{{ Title }}</h1>{{ Content }}')
+        rendered, skipped, _ = self.build(manifest)
+        self.assertEqual((rendered, skipped), (2, 0))
+
+    def test_incremental_missing_output(self):
+        manifest = Manifest()
+        self.build(manifest)
+        os.remove(os.path.join(self.public, 'index.html'))
+        rendered, skipped, _ = self.build(manifest)
+        self.assertEqual((rendered, skipped), (1, 1))
+
+    def test_incremental_removes_stale_outputs(self):
+        manifest = Manifest()
+        self.build(manifest)
+        os.remove(os.path.join(self.content, 'blog', 'index.md'))
+        rendered, skipped, removed = self.build(manifest)
+        self.assertEqual((rendered, skipped, len(removed)), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'blog')))
+
+    def test_parallel_build(self):
+        for i in range(6):
+            self.write(os.path.join(self.content, 'posts', f'{i}.md'), f'# Post {i}\n\nBody {i}')
+        self.assertEqual(self.build(Manifest(), incremental=False, jobs=3), (8, 0, []))
+        self.assertEqual(self.read('posts', '5.html'), '<title>Post 5</title><main><div><h1>Post 5</h1><p>Body 5</p></div></main>')
+
+    def test_streamed_large_pages(self):
+        expected = self.build(Manifest(), incremental=False)
+        full = self.read('index.html')
+        with mock.patch.object(main, 'STREAM_THRESHOLD', 0):
+            self.assertEqual(self.build(Manifest(), incremental=False), expected)
+        self.assertEqual(self.read('index.html'), full)
+
+    def test_page_text_only_collected_for_search(self):
+        source = os.path.join(self.content, 'index.md')
+        dest = os.path.join(self.public, 'index.html')
+        for threshold in [STREAM_THRESHOLD, 0]:
+            with mock.patch.object(main, 'STREAM_THRESHOLD', threshold):
+                self.assertEqual(main.render_page(source, self.template, dest).text, '')
+                with mock.patch.object(main.search, 'enabled', True):
+                    self.assertEqual(main.render_page(source, self.template, dest).text, 'Home\n\nWelcome')
+        with mock.patch.object(main.io_pipeline, 'threads', 2):
+            self.assertEqual(main.render_batch([(source, self.template, dest, '/')])[0][1].text, '')
+
+    def test_pipelined_build(self):
+        for i in range(6):
+            self.write(os.path.join(self.content, 'posts', f'{i}.md'), f'# Post {i}\n\nBody {i}')
+        self.write(os.path.join(self.content, 'broken.md'), 'no title')
+        with mock.patch.object(main.io_pipeline, 'threads', 4):
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = build_pages(self.content, self.template, self.public, Manifest())
+            self.assertEqual(result.rendered, 8)
+            self.assertEqual(result.errors, [(os.path.join(self.content, 'broken.md'), 'Exception: No header in markdown')])
+            self.assertEqual(self.read('posts', '5.html'), '<title>Post 5</title><main><div><h1>Post 5</h1><p>Body 5</p></div></main>')
+            with mock.patch.object(main, 'STREAM_THRESHOLD', 0):
+                self.assertEqual(self.build(Manifest(), incremental=False)[0], 8)
+        self.assertEqual(self.read('index.html'), '<title>Home</title><main><div><h1>Home</h1><p>Welcome</p></div></main>')
+
+    def test_minified_build(self):
+        self.write(os.path.join(self.content, 'links.md'), '# Links\n\n[home](/index.html) and ![a cat](/cat.png)')
+        with mock.patch.object(main.templates, 'minify', True):
+            self.build(Manifest(), incremental=False)
+            with mock.patch.object(main, 'STREAM_THRESHOLD', 0):
+                self.build(Manifest(), incremental=False)
+                streamed = self.read('links.html')
+        self.assertEqual(
+            self.read('links.html'),
+            '<title>Links</title><main><div><h1>Links</h1>'
+            '<p><a href=/index.html>home</a> and <img alt="a cat" src=/cat.png></img></p></div></main>',
+        )
+        self.assertEqual(streamed, self.read('links.html'))
+
+    def test_spawned_workers_get_render_settings(self):
+        self.write(os.path.join(self.content, 'links.md'), '# Links\n\n[home](/index.html) and ![a cat](/cat.png)')
+        spawn = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        with (
+            mock.patch.object(main, 'ProcessPoolExecutor', spawn),
+            mock.patch.object(main.templates, 'minify', True),
+            mock.patch.dict(main.image_props, {'/cat.png': {'width': '640'}}),
+        ):
+            self.assertEqual(self.build(Manifest(), incremental=False, jobs=2)[0], 3)
+        self.assertIn('<a href=/index.html>home</a>', self.read('links.html'))
+        self.assertIn('<img alt="a cat" src=/cat.png width=640>', self.read('links.html'))
+
+    def test_search_index(self):
+        search_path = os.path.join(self.public, 'search')
+        main.search.enabled = True
+        self.addCleanup(setattr, main.search, 'enabled', False)
+        self.addCleanup(main.search.clear)
+        main.search.clear()
+        manifest = Manifest()
+        self.build(manifest)
+        main.search.write(search_path)
+        self.assertEqual(SearchReader(search_path).query('posts'), [('/blog/', 'Blog', 1)])
+
+        main.search.clear()
+        self.assertEqual(self.build(manifest)[:2], (2, 0))
+        self.write(os.path.join(self.content, 'blog', 'index.md'), '# Blog\n\nNo more')
+        self.assertEqual(self.build(manifest)[:2], (1, 1))
+        main.search.write(search_path)
+        self.assertEqual(SearchReader(search_path).query('posts'), [])
+        self.assertEqual(SearchReader(search_path).query('home'), [('/', 'Home', 1)])
+
+    def test_check_links(self):
+        self.write(os.path.join(self.content, 'blog', 'post.md'), '# Post\n\nBack to [the blog](./) or [missing](/gone.html)')
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\nRead [the post](/blog/post.html) and ![a](/cat.png)')
+        self.write(os.path.join(self.public, 'cat.png'), '')
+        manifest = Manifest()
+        self.build(manifest)
+        with mock.patch.object(main, 'site_links', main.SiteLinks('https://example.com/', backlinks=True)):
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                broken = main.check_links(manifest, BuildConfig(public_path=self.public))
+        post = os.path.join(self.content, 'blog', 'post.md')
+        self.assertEqual(broken, [(post, '/gone.html')])
+        self.assertIn(f'Broken link in {post}: /gone.html', out.getvalue())
+        self.assertEqual(json.loads(self.read('backlinks.json')), {'/blog/': ['/blog/post.html'], '/blog/post.html': ['/']})
+        self.assertIn('<loc>https://example.com/blog/post.html</loc>', self.read('sitemap.xml'))
+        self.assertIn('<title>Home</title>', self.read('feed.xml'))
+
+        os.remove(os.path.join(self.public, 'sitemap.xml'))
+        with mock.patch.object(main, 'site_links', main.SiteLinks('https://example.com/', backlinks=True)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                config = BuildConfig(public_path=self.public)
+                self.assertEqual(main.check_links(manifest, config, [os.path.join(self.content, 'index.md')]), [])
+                self.assertEqual(main.check_links(manifest, config, [post]), [(post, '/gone.html')])
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'sitemap.xml')))
+
+    def test_image_props_and_inputs(self):
+        static = os.path.join(self.tmp.name, 'static')
+        image = os.path.join(static, 'cat.png')
+        self.write(image, '')
+        pipeline = main.ImagePipeline()
+        pipeline.enabled = True
+        pipeline.sources = {'/cat.png': image}
+        pipeline.props = {'/cat.png': {'width': '640', 'height': '480', 'loading': 'lazy'}}
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\n![a cat](/cat.png) here')
+        manifest = Manifest()
+        self.addCleanup(main.image_props.clear)
+        with mock.patch.object(main, 'images', pipeline):
+            main.update_image_props()
+            self.build(manifest)
+            self.assertIn('<img alt="a cat" src="/cat.png" width="640" height="480" loading="lazy">', self.read('index.html'))
+            self.assertIn(image, manifest.deps.inputs[os.path.join(self.content, 'index.md')])
+            self.write(image, 'changed')
+            self.assertEqual(self.explain(manifest), [f'Rebuild {os.path.join(self.content, "index.md")}: {image} changed'])
+
+    def test_fingerprinted_assets(self):
+        static = os.path.join(self.tmp.name, 'static')
+        self.write(os.path.join(static, 'index.css'), 'body {}')
+        self.write(os.path.join(static, 'cat.png'), 'meow')
+        self.write(self.template, '<link href="/index.css"><main>{{ Content }}</main>')
+        self.write(os.path.join(self.content, 'index.md'), '# Home\n\n![a cat](/cat.png) here')
+        fingerprints = main.AssetFingerprints()
+        fingerprints.enabled = True
+        fingerprints.process(static, self.public)
+        css = fingerprints.urls['/index.css']
+        self.assertRegex(css, r'^/index\.[0-9a-f]{10}\.css$')
+        self.assertEqual(self.read(css.lstrip('/')), 'body {}')
+        manifest = Manifest()
+        self.addCleanup(main.image_props.clear)
+        with mock.patch.object(main, 'assets', fingerprints), mock.patch.object(main, 'templates', main.TemplateCache()):
+            main.templates.assets = fingerprints
+            main.update_image_props()
+            self.build(manifest)
+            html = self.read('index.html')
+            self.assertIn(f'<link href="{css}">', html)
+            self.assertIn(f'<img alt="a cat" src="{fingerprints.urls["/cat.png"]}">', html)
+            self.assertEqual(self.read('blog', 'index.html'), f'<link href="{css}"><main><div><h1>Blog</h1><p>Posts</p></div></main>')
+
+            self.write(os.path.join(static, 'index.css'), 'body { color: red }')
+            removed = fingerprints.process(static, self.public).removed
+            self.assertEqual(removed, [css.lstrip('/')])
+            self.assertEqual(self.build(manifest)[:2], (2, 0))
+            self.assertIn(fingerprints.urls['/index.css'], self.read('blog', 'index.html'))
+
+            self.write(os.path.join(static, 'cat.png'), 'purr')
+            fingerprints.process(static, self.public)
+            main.update_image_props()
+            self.assertEqual(self.build(manifest)[:2], (1, 1))
+            self.assertIn(f'src="{fingerprints.urls["/cat.png"]}"', self.read('index.html'))
+
+    def test_profiled_build(self):
+        self.build(Manifest(), incremental=False)
+        full = self.read('index.html')
+        main.profiler.enabled = True
+        self.addCleanup(setattr, main.profiler, 'enabled', False)
+        main.profiler.clear()
+        with mock.patch.object(main, 'blocks', main.BlockCache()):
+            self.assertEqual(self.build(Manifest(), incremental=False)[0], 2)
+        self.assertEqual(self.read('index.html'), full)
+        self.assertEqual(len(main.profiler.pages), 2)
+        for name in ['read', 'split_blocks', 'block_cache', 'block_type', 'inline', 'node_text', 'to_html', 'template']:
+            self.assertIn(name, main.profiler.stages)
+        self.assertEqual(main.profiler.stages['inline']['calls'], 4)
+        self.assertEqual(main.profiler.stages['read']['bytes'], len('# Home\n\nWelcome') + len('# Blog\n\nPosts'))
+        self.assertEqual(main.profiler.stages['write']['calls'], 2)
+
+        main.profiler.clear()
+        with mock.patch.object(main, 'STREAM_THRESHOLD', 0):
+            self.assertEqual(self.build(Manifest(), incremental=False)[0], 2)
+        self.assertEqual(self.read('index.html'), full)
+        self.assertNotIn('read', main.profiler.stages)
+        self.assertEqual(main.profiler.stages['scan_metadata']['calls'], 2)
+        self.assertEqual(main.profiler.stages['write']['bytes'], sum(page['bytes_out'] for page in main.profiler.pages))
+
+    def test_block_cache_persistence_is_optional(self):
+        config = BuildConfig(
+            content_path=self.content,
+            static_path=os.path.join(self.tmp.name, 'static'),
+            template_path=self.template,
+            public_path=self.public,
+            cache_path=os.path.join(self.tmp.name, '.build-cache'),
+            incremental=True,
+            block_cache=False,
+        )
+        os.makedirs(config.static_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.build(config)
+        self.assertTrue(os.path.exists(config.manifest_path))
+        self.assertFalse(os.path.exists(config.block_cache_path))
+        self.assertFalse(main.parse_config(['--no-block-cache'])[1].block_cache)
+
+    def test_profile_option_does_not_take_the_command(self):
+        args, config = main.parse_config(['--profile', 'serve'])
+        self.assertEqual((args.command, config.profile), ('serve', BuildConfig().profile_path))
+        args, config = main.parse_config(['--profile', '--profile-output', 'out.json'])
+        self.assertEqual((args.command, config.profile), (None, 'out.json'))
+        self.assertIsNone(main.parse_config([])[1].profile)
+
+    def test_repeated_profiled_builds(self):
+        profile = os.path.join(self.tmp.name, 'profile.json')
+        config = BuildConfig(
+            content_path=self.content,
+            static_path=os.path.join(self.tmp.name, 'static'),
+            template_path=self.template,
+            public_path=self.public,
+            cache_path=os.path.join(self.tmp.name, '.build-cache'),
+            profile=profile,
+        )
+        os.makedirs(config.static_path)
+        reports = []
+        for _ in range(2):
+            with contextlib.redirect_stdout(io.StringIO()):
+                main.build(config)
+            with open(profile, encoding='utf-8') as f:
+                reports.append(json.load(f))
+        self.assertEqual([len(report['pages']) for report in reports], [2, 2])
+        self.assertEqual(reports[1]['stages']['write']['calls'], 2)
+
+    def test_page_errors_do_not_stop_the_build(self):
+        self.write(os.path.join(self.content, 'broken.md'), 'no heading here')
+        manifest = Manifest()
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            result = build_pages(self.content, self.template, self.public, manifest, jobs=2)
+        self.assertEqual(result.rendered, 2)
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn('broken.md', result.errors[0][0])
+        self.assertNotIn(os.path.join(self.content, 'broken.md'), manifest.pages)
+        logged = [line.split()[3] for line in out.getvalue().splitlines() if line.startswith('Generation')]
+        expected = [
+            os.path.join(self.content, 'blog', 'index.md'),
+            os.path.join(self.content, 'broken.md'),
+            os.path.join(self.content, 'index.md'),
+        ]
+        self.assertEqual(logged, expected)
+
+    def test_directory_template(self):
+        self.write(os.path.join(self.content, 'blog', 'template.html'), '<nav>{{ Nav }}</nav>{{ Content }}')
+        manifest = Manifest()
+        rendered, _, _ = self.build(manifest)
+        self.assertEqual(rendered, 2)
+        self.assertEqual(
+            self.read('blog', 'index.html'),
+            '<nav><nav><a href="/">Home</a> / <a href="/blog/">blog</a></nav></nav><div><h1>Blog</h1><p>Posts</p></div>',
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'blog', 'template.html')))
+        self.write(os.path.join(self.content, 'blog', 'template.html'), '{{ Content }}')
+        self.assertEqual(self.build(manifest)[:2], (1, 1))
+
+    def test_explain(self):
+        manifest = Manifest()
+        index = os.path.normpath(os.path.join(self.content, 'index.md'))
+        blog = os.path.normpath(os.path.join(self.content, 'blog', 'index.md'))
+        self.assertEqual(self.explain(manifest), [f'Rebuild {blog}: new page', f'Rebuild {index}: new page'])
+        self.assertEqual(self.explain(manifest), [])
+        self.write(blog, '# Blog\n\nEdited')
+        self.assertEqual(self.explain(manifest), [f'Rebuild {blog}: {blog} changed'])
+        blog_template = os.path.join(self.content, 'blog', 'template.html')
+        self.write(blog_template, '<article>{{ Content }}</article>')
+        self.assertEqual(self.explain(manifest), [f'Rebuild {blog}: {os.path.normpath(blog_template)} is a new input'])
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join('public', 'index.html'), 'public'), '/')
+        self.assertEqual(page_url(os.path.join('public', 'blog', 'index.html'), 'public'), '/blog/')
+        self.assertEqual(page_url(os.path.join('public', 'blog', 'post.html'), 'public'), '/blog/post.html')
+
+    def test_page_nav(self):
+        self.assertEqual(page_nav('/').to_html(), '<nav><a href="/">Home</a></nav>')
+        self.assertEqual(
+            page_nav('/blog/post.html').to_html(),
+            '<nav><a href="/">Home</a> / <a href="/blog/">blog</a> / <a href="/blog/post.html">post</a></nav>',
+        )
+
+    def test_split_batches(self):
+        pages = list(range(10))
+        batches = split_batches(pages, 2)
+        self.assertEqual([p for batch in batches for p in batch], pages)
+        self.assertEqual(len(batches), 5)
+
+
+class TestApplyChanges(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, 'static')
+        self.write(os.path.join(self.static, 'index.css'), 'body {}')
+        self.manifest = Manifest()
+        self.build(self.manifest)
+
+    def apply(self, changed, removed=(), **options):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            config = BuildConfig(
+                content_path=self.content,
+                static_path=self.static,
+                template_path=self.template,
+                public_path=self.public,
+                **options,
+            )
+            self.rebuilt = apply_changes(changed, list(removed), self.manifest, config)
+        return out.getvalue()
+
+    def test_changed_page(self):
+        page = os.path.join(self.content, 'blog', 'index.md')
+        self.write(page, '# Blog\n\nEdited')
+        out = self.apply([page])
+        self.assertEqual(out.count('Generation page'), 1)
+        self.assertEqual(self.rebuilt, [os.path.normpath(page)])
+        self.assertIn('Edited', self.read('blog', 'index.html'))
+        self.assertEqual(self.build(self.manifest)[:2], (0, 2))
+
+    def test_removed_page(self):
+        page = os.path.join(self.content, 'blog', 'index.md')
+        os.remove(page)
+        self.apply([], [page])
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'blog', 'index.html')))
+        self.assertNotIn(os.path.normpath(page), self.manifest.pages)
+
+    def test_static_file(self):
+        css = os.path.join(self.static, 'index.css')
+        self.apply([css])
+        self.assertEqual(self.read('index.css'), 'body {}')
+        os.remove(css)
+        self.apply([], [css])
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'index.css')))
+
+    def test_static_check(self):
+        css = os.path.join(self.static, 'index.css')
+        self.apply([css], static_check='hash')
+        self.assertIsNotNone(self.manifest.static['index.css']['hash'])
+
+    def test_new_page(self):
+        page = os.path.join(self.content, 'about.md')
+        self.write(page, '# About')
+        out = self.apply([page])
+        self.assertEqual(out.count('Generation page'), 1)
+        self.assertIn('About', self.read('about.html'))
+        self.assertEqual(self.build(self.manifest)[:2], (0, 3))
+
+    def test_directory_template_rebuilds_dependents(self):
+        blog_template = os.path.join(self.content, 'blog', 'template.html')
+        self.write(blog_template, '<article>{{ Content }}</article>')
+        out = self.apply([blog_template])
+        self.assertEqual(out.count('Generation page'), 1)
+        self.assertTrue(self.read('blog', 'index.html').startswith('<article>'))
+
+        self.write(blog_template, '<section>{{ Content }}</section>')
+        out = self.apply([blog_template])
+        self.assertEqual(out.count('Generation page'), 1)
+        self.assertTrue(self.read('blog', 'index.html').startswith('<section>'))
+
+        os.remove(blog_template)
+        out = self.apply([], [blog_template])
+        self.assertEqual(out.count('Generation page'), 1)
+        self.assertTrue(self.read('blog', 'index.html').startswith('<title>'))
+        self.assertEqual(self.build(self.manifest)[:2], (0, 2))
+
+    def test_template_rebuilds_every_page(self):
+        self.write(self.template, '<main>{{ Content }}</main>')
+        out = self.apply([self.template])
+        self.assertEqual(out.count('Generation page'), 2)
+        self.assertEqual(self.read('index.html'), '<main><div><h1>Home</h1><p>Welcome</p></div></main>')
+
+
+class TestDirectoryWalks(unittest.TestCase):
+    depth = 1200
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(self.remove_deep_trees)
+        self.parts = ['d'] * self.depth
+        self.source = os.path.join(self.tmp.name, 'src')
+        path = self.source
+        os.mkdir(path)
+        for part in self.parts:
+            path = os.path.join(path, part)
+            os.mkdir(path)
+        with open(os.path.join(self.source, *self.parts, 'page.md'), 'w', encoding='utf-8') as f:
+            f.write('# Deep')
+        with open(os.path.join(self.source, 'top.md'), 'w', encoding='utf-8') as f:
+            f.write('# Top')
+
+    def remove_deep_trees(self):
+        for name in ['src', 'out']:
+            path = os.path.join(self.tmp.name, name)
+            if os.path.exists(path):
+                remove_tree(path)
+
+    def test_discover_pages_deep_tree(self):
+        dest = os.path.join(self.tmp.name, 'out')
+        pages = [(origin, str(destination)) for origin, destination in discover_pages(self.source, dest)]
+        self.assertEqual(
+            pages,
+            [
+                (os.path.join(self.source, *self.parts, 'page.md'), os.path.join(dest, *self.parts, 'page.html')),
+                (os.path.join(self.source, 'top.md'), os.path.join(dest, 'top.html')),
+            ],
+        )
+
+    def test_build_pages_deep_tree(self):
+        dest = os.path.join(self.tmp.name, 'out')
+        template = os.path.join(self.tmp.name, 'template.html')
+        with open(template, 'w', encoding='utf-8') as f:
+            f.write('{{ Content }}')
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = build_pages(self.source, template, dest, Manifest())
+        self.assertEqual((result.rendered, result.errors), (2, []))
+        with open(os.path.join(dest, *self.parts, 'page.html'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), '<div><h1>Deep</h1></div>')
+
+
+if __name__ == '__main__':
+    unittest.main()
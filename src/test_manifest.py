@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from manifest import Manifest, hash_file
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output = os.path.join(self.tmp.name, 'index.html')
+        with open(self.output, 'w', encoding='utf-8') as f:
+            f.write('<p>hi</p>')
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.output), hash_file(self.output))
+        other = os.path.join(self.tmp.name, 'other.html')
+        with open(other, 'w', encoding='utf-8') as f:
+            f.write('<p>bye</p>')
+        self.assertNotEqual(hash_file(self.output), hash_file(other))
+
+    def test_rebuild_reasons(self):
+        manifest = Manifest()
+        hashes = {'index.md': 'a', 'template.html': 't'}
+        expected = ['index.md', 'template.html']
+        self.assertEqual(manifest.rebuild_reasons('index.md', self.output, expected, hashes.get), ['new page'])
+        manifest.record('index.md', self.output, 'template.html', hashes)
+        self.assertEqual(manifest.rebuild_reasons('index.md', self.output, expected, hashes.get), [])
+        hashes['template.html'] = 'u'
+        self.assertEqual(
+            manifest.rebuild_reasons('index.md', self.output, expected, hashes.get), ['template.html changed']
+        )
+        del hashes['template.html']
+        self.assertEqual(
+            manifest.rebuild_reasons('index.md', self.output, expected, hashes.get), ['template.html removed']
+        )
+
+    def test_rebuild_reasons_output_and_new_inputs(self):
+        manifest = Manifest()
+        hashes = {'index.md': 'a', 'template.html': 't'}
+        manifest.record('index.md', self.output, 'template.html', hashes)
+        reasons = manifest.rebuild_reasons('index.md', self.output, ['index.md', 'blog/template.html'], hashes.get)
+        self.assertEqual(reasons, ['blog/template.html is a new input'])
+        os.remove(self.output)
+        self.assertEqual(manifest.rebuild_reasons('index.md', self.output, [], hashes.get), ['output missing'])
+
+    def test_save_and_load(self):
+        path = os.path.join(self.tmp.name, 'cache', 'manifest.json')
+        manifest = Manifest()
+        manifest.record('index.md', self.output, 'template.html', {'index.md': 'a', 'template.html': 't'})
+        manifest.save(path)
+        loaded = Manifest.load(path)
+        self.assertEqual(loaded.pages, manifest.pages)
+        self.assertEqual(loaded.deps.inputs, manifest.deps.inputs)
+        self.assertEqual(loaded.deps.affected(['template.html']), {'index.md': ['template.html']})
+
+    def test_save_skips_unchanged(self):
+        path = os.path.join(self.tmp.name, 'cache', 'manifest.json')
+        manifest = Manifest()
+        manifest.record('index.md', self.output, 'template.html', {'index.md': 'a'})
+        manifest.save(path)
+        os.utime(path, ns=(0, 0))
+        Manifest.load(path).save(path)
+        manifest.save(path)
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+        manifest.options = {'minify': True}
+        manifest.save(path)
+        self.assertNotEqual(os.stat(path).st_mtime_ns, 0)
+
+    def test_load_missing_or_corrupt(self):
+        self.assertEqual(Manifest.load(os.path.join(self.tmp.name, 'missing.json')).pages, {})
+        path = os.path.join(self.tmp.name, 'corrupt.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{not json')
+        self.assertEqual(Manifest.load(path).pages, {})
+
+    def test_prune(self):
+        manifest = Manifest()
+        manifest.record('a.md', 'a.html', 'template.html', {'a.md': 'a', 'template.html': 't'})
+        manifest.record('b.md', 'b.html', 'template.html', {'b.md': 'b', 'template.html': 't'})
+        self.assertEqual(manifest.prune(['a.md']), ['b.html'])
+        self.assertEqual(list(manifest.pages), ['a.md'])
+        self.assertEqual(manifest.deps.affected(['template.html', 'b.md']), {'a.md': ['template.html']})
+
+
+if __name__ == '__main__':
+    unittest.main()
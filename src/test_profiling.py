@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        profiler = Profiler()
+        with profiler.stage('parse'):
+            pass
+        with profiler.page_timer('a.md', 'a.html') as page:
+            self.assertIsNone(page)
+        self.assertEqual(profiler.export(), {'stages': {}, 'pages': []})
+
+    def test_stages_and_pages(self):
+        profiler = Profiler(enabled=True)
+        with profiler.page_timer('a.md', 'a.html') as page:
+            with profiler.stage('read'):
+                page['bytes_in'] = 10
+            profiler.add_bytes('read', 10)
+            with profiler.stage('write', 20):
+                pass
+        with profiler.stage('copy_static'):
+            pass
+        self.assertEqual(profiler.stages['read']['calls'], 1)
+        self.assertEqual(profiler.stages['read']['bytes'], 10)
+        self.assertEqual(profiler.stages['write']['bytes'], 20)
+        self.assertEqual(len(profiler.pages), 1)
+        self.assertEqual(sorted(profiler.pages[0]['stages']), ['read', 'write'])
+        self.assertIn('a.md', profiler.report(top=1))
+
+    def test_nested_stages_record_self_time(self):
+        profiler = Profiler(enabled=True)
+        with profiler.stage('write'):
+            with profiler.stage('template'):
+                time.sleep(0.02)
+        self.assertGreaterEqual(profiler.stages['template']['seconds'], 0.02)
+        self.assertLess(profiler.stages['write']['seconds'], 0.01)
+
+    def test_merge(self):
+        worker = Profiler(enabled=True)
+        with worker.page_timer('a.md', 'a.html'):
+            with worker.stage('parse'):
+                pass
+        profiler = Profiler(enabled=True)
+        with profiler.stage('parse'):
+            pass
+        profiler.merge(json.loads(json.dumps(worker.export())))
+        self.assertEqual(profiler.stages['parse']['calls'], 2)
+        self.assertEqual([page['source'] for page in profiler.pages], ['a.md'])
+
+    def test_write_json(self):
+        profiler = Profiler(enabled=True)
+        for source in ['b.md', 'a.md']:
+            with profiler.page_timer(source, 'out.html'):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'reports', 'profile.json')
+            profiler.write_json(path)
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        self.assertEqual(data['version'], 1)
+        self.assertEqual([page['source'] for page in data['pages']], ['a.md', 'b.md'])
+
+
+if __name__ == '__main__':
+    unittest.main()
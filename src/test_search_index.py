@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+from search_index import SearchIndex, SearchReader, decode_postings, encode_postings, shard_key, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+    def test_positions(self):
+        self.assertEqual(tokenize('The ring, the RING!'), {'the': [0, 2], 'ring': [1, 3]})
+        self.assertEqual(tokenize(''), {})
+
+    def test_shard_key(self):
+        self.assertEqual(shard_key('hobbit'), 'ho')
+        self.assertEqual(shard_key('a'), 'a')
+
+    def test_postings_are_delta_encoded(self):
+        pages = {7: [3, 10], 2: [0]}
+        self.assertEqual(encode_postings(pages), '[[2,0],[5,3,7]]')
+        self.assertEqual(decode_postings([[2, 0], [5, 3, 7]]), pages)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = os.path.join(self.tmp.name, 'search')
+        self.index = SearchIndex()
+        self.index.update('a.md', '/a.html', 'Hobbits', 'Hobbits live in the Shire. Hobbits like food.')
+        self.index.update('b.md', '/b.html', 'Wizards', 'Wizards visit the Shire')
+        self.index.write(self.directory)
+
+    def test_query(self):
+        reader = SearchReader(self.directory)
+        self.assertEqual(reader.query('shire'), [('/a.html', 'Hobbits', 1), ('/b.html', 'Wizards', 1)])
+        self.assertEqual(reader.query('hobbits shire'), [('/a.html', 'Hobbits', 3)])
+        self.assertEqual(reader.query('wizards hobbits'), [])
+        self.assertEqual(reader.query('balrog'), [])
+        self.assertEqual(reader.query('   '), [])
+        self.assertEqual(reader.postings('wizards'), {1: [0]})
+        self.assertEqual(sorted(reader.loaded), ['ho', 'sh', 'wi'])
+
+    def test_incremental_update_rewrites_only_touched_shards(self):
+        index = SearchIndex()
+        index.load(self.directory)
+        self.assertIn('a.md', index)
+        self.assertEqual(index.postings, self.index.postings)
+        index.update('b.md', '/b.html', 'Wizards', 'Wizards visit Bree')
+        self.assertEqual(index.dirty, {'wi', 'vi', 'br', 'th', 'sh'})
+        self.assertEqual(index.write(self.directory), 5)
+        reader = SearchReader(self.directory)
+        self.assertEqual(reader.query('bree'), [('/b.html', 'Wizards', 1)])
+        self.assertEqual(reader.query('shire'), [('/a.html', 'Hobbits', 1)])
+
+    def test_remove_and_prune(self):
+        self.index.update('c.md', '/c.html', 'Bree', 'Bree')
+        self.index.prune(['a.md', 'c.md'])
+        self.index.remove('c.md')
+        self.index.write(self.directory)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'wi.json')))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'br.json')))
+        reader = SearchReader(self.directory)
+        self.assertEqual(reader.query('wizards'), [])
+        self.assertEqual(list(reader.pages), [0])
+
+    def test_page_ids_are_stable(self):
+        self.index.remove('a.md')
+        self.index.update('c.md', '/c.html', 'Ents', 'Ents')
+        self.index.update('a.md', '/a.html', 'Hobbits', 'Hobbits')
+        self.assertEqual({source: entry[0] for source, entry in self.index.pages.items()}, {'b.md': 1, 'c.md': 2, 'a.md': 3})
+
+    def test_removed_shard_updates_page_list(self):
+        self.index.update('b.md', '/b.html', 'Wizards', 'Bree')
+        self.index.write(self.directory)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'wi.json')))
+        self.assertEqual(SearchReader(self.directory).query('wizards'), [])
+
+    def test_large_shards_are_split(self):
+        index = SearchIndex(max_shard_bytes=200)
+        for i in range(40):
+            index.update(f'{i}.md', f'/{i}.html', f'Page {i}', f'the theory of {i} then the end {"thin " * (i % 3)}')
+        index.write(self.directory)
+        sizes = {name: os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory)}
+        del sizes['pages.json']
+        self.assertLessEqual(max(sizes.values()), 200)
+        self.assertIn('the.0', index.shards)
+        self.assertIn('thi', index.shards)
+        self.assertGreater(len(index.parts['the']), 1)
+
+        reader = SearchReader(self.directory)
+        self.assertEqual(len(reader.query('the')), 10)
+        self.assertEqual(reader.postings('the')[39], [0, 5])
+        self.assertEqual(reader.query('theory 7 thin'), [('/7.html', 'Page 7', 3)])
+        self.assertEqual(reader.query('thx'), [])
+
+        loaded = SearchIndex(max_shard_bytes=200)
+        loaded.load(self.directory)
+        self.assertEqual(loaded.postings, index.postings)
+        self.assertEqual((loaded.parts, loaded.part_pages), (index.parts, index.part_pages))
+        loaded.update('39.md', '/39.html', 'Page 39', 'the end')
+        self.assertEqual(len(loaded.dirty), 6)
+        self.assertIn(f'the.{loaded.parts["the"][-1]}', loaded.dirty)
+        self.assertNotIn('the.0', loaded.dirty)
+        loaded.write(self.directory)
+        self.assertEqual(SearchReader(self.directory).postings('the')[39], [0])
+
+    def test_load_missing_index(self):
+        index = SearchIndex()
+        index.load(os.path.join(self.tmp.name, 'missing'))
+        self.assertEqual((index.pages, index.postings), ({}, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from fileutils import make_dirs, remove_tree
+from manifest import Manifest
+from static_sync import reflink, sync_static
+
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.static = os.path.join(self.tmp.name, 'static')
+        self.public = os.path.join(self.tmp.name, 'public')
+        self.write(os.path.join(self.static, 'index.css'), 'body {}')
+        self.write(os.path.join(self.static, 'images', 'logo.png'), 'png')
+        self.manifest = Manifest()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts), encoding='utf-8') as f:
+            return f.read()
+
+    def test_copies_then_skips_unchanged(self):
+        result = sync_static(self.static, self.public, self.manifest)
+        self.assertEqual(sorted(result.copied), ['images/logo.png', 'index.css'])
+        self.assertEqual(self.read('images', 'logo.png'), 'png')
+        result = sync_static(self.static, self.public, self.manifest)
+        self.assertEqual((result.copied, result.skipped), ([], 2))
+
+    def test_deep_tree(self):
+        parts = ['d'] * 1200
+        self.addCleanup(remove_tree, self.static)
+        make_dirs(os.path.join(self.static, *parts))
+        self.write(os.path.join(self.static, *parts, 'page.md'), '# Deep')
+        result = sync_static(self.static, self.public, self.manifest)
+        self.assertIn('/'.join(parts + ['page.md']), result.copied)
+        self.assertEqual(self.read(*parts, 'page.md'), '# Deep')
+        remove_tree(self.public)
+
+    def test_recopies_changed_and_missing_files(self):
+        sync_static(self.static, self.public, self.manifest)
+        self.write(os.path.join(self.static, 'index.css'), 'body { color: red }')
+        os.remove(os.path.join(self.public, 'images', 'logo.png'))
+        result = sync_static(self.static, self.public, self.manifest)
+        self.assertEqual(sorted(result.copied), ['images/logo.png', 'index.css'])
+        self.assertEqual(self.read('index.css'), 'body { color: red }')
+
+    def test_hash_check_skips_touched_files(self):
+        sync_static(self.static, self.public, self.manifest, check='hash')
+        css = os.path.join(self.static, 'index.css')
+        os.utime(css, ns=(0, 0))
+        result = sync_static(self.static, self.public, self.manifest, check='hash')
+        self.assertEqual((result.copied, result.skipped), ([], 2))
+        self.assertEqual(self.manifest.static['index.css']['mtime_ns'], 0)
+
+    def test_removes_stale_files(self):
+        sync_static(self.static, self.public, self.manifest)
+        os.remove(os.path.join(self.static, 'images', 'logo.png'))
+        result = sync_static(self.static, self.public, self.manifest)
+        self.assertEqual(result.removed, ['images/logo.png'])
+        self.assertFalse(os.path.exists(os.path.join(self.public, 'images')))
+        self.assertNotIn('images/logo.png', self.manifest.static)
+
+    def test_hardlink_mode(self):
+        sync_static(self.static, self.public, self.manifest, mode='hardlink')
+        source = os.stat(os.path.join(self.static, 'index.css'))
+        self.assertEqual(os.stat(os.path.join(self.public, 'index.css')).st_ino, source.st_ino)
+        sync_static(self.static, self.public, Manifest(), mode='copy')
+        self.assertNotEqual(os.stat(os.path.join(self.public, 'index.css')).st_ino, source.st_ino)
+        self.assertEqual(self.read('index.css'), 'body {}')
+
+    def test_reflink_falls_back_to_copy(self):
+        dest = os.path.join(self.tmp.name, 'copy.css')
+        reflink(os.path.join(self.static, 'index.css'), dest)
+        with open(dest, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'body {}')
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.static, self.public, self.manifest, mode='rsync')
+
+
+if __name__ == '__main__':
+    unittest.main()
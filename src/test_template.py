@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetFingerprints
+from htmlnode import LeafNode, ParentNode
+from template import Template, TemplateCache, minify_html, resolve_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template('<title>{{ Title }}</title><main>{{ Content }}</main>')
+        self.assertEqual(template.segments, ['<title>', '</title><main>', '</main>'])
+        self.assertEqual(template.slots, ['Title', 'Content'])
+
+    def test_render(self):
+        template = Template('<title> {{ Title }} </title>{{ Content }}<p>{{ Date }}</p>')
+        content = ParentNode('div', [LeafNode('b', 'bold')])
+        result = template.render({'Title': 'Home', 'Content': content, 'Date': '2024-01-01'})
+        self.assertEqual(result, '<title> Home </title><div><b>bold</b></div><p>2024-01-01</p>')
+
+    def test_render_missing_slot_is_left_alone(self):
+        template = Template('{{ Title }} {{ Unknown }}')
+        self.assertEqual(template.render({'Title': 'Home'}), 'Home {{ Unknown }}')
+
+    def test_values_are_not_substituted_again(self):
+        template = Template('{{ Title }}|{{ Content }}')
+        self.assertEqual(template.render({'Title': '{{ Content }}', 'Content': 'x'}), '{{ Content }}|x')
+
+    def test_slot_repeated(self):
+        template = Template('{{ Title }} - {{ Title }}')
+        self.assertEqual(template.render({'Title': 'A'}), 'A - A')
+
+    def test_minify_html(self):
+        text = '<!DOCTYPE html>\n<html>\n  <!-- note -->\n  <head>\n    <link href="/a.css" rel="stylesheet">\n  </head>\n'
+        self.assertEqual(minify_html(text), '<!DOCTYPE html><html><head><link href=/a.css rel=stylesheet></head>')
+
+    def test_minify_keeps_inline_spaces_and_raw_blocks(self):
+        text = '<p>a   <b>b</b>\n <i>c</i> <!-- x --> d</p>\n<pre>  keep\n  this </pre>\n<script> if (a  <  b) {} </script>'
+        self.assertEqual(
+            minify_html(text),
+            '<p>a <b>b</b> <i>c</i> d</p><pre>  keep\n  this </pre><script> if (a  <  b) {} </script>',
+        )
+
+    def test_minify_keeps_quotes_where_needed(self):
+        text = '<a href="/" title="two words" class="x" data-y="a=b"><!--[if IE]>ie<![endif]-->'
+        self.assertEqual(minify_html(text), '<a href="/" title="two words" class=x data-y="a=b"><!--[if IE]>ie<![endif]-->')
+
+    def test_minified_template(self):
+        text = '<html>\n<title> {{ Title }} </title>\n<meta content="{{ Description }}">\n<main>\n  {{ Content }}\n</main>\n'
+        template = Template(text, True)
+        self.assertEqual(template.segments, ['<html><title>', '</title><meta content="', '"><main>', '</main>'])
+        content = ParentNode('p', [LeafNode('a', 'x', {'href': '/x'})])
+        self.assertEqual(
+            template.render({'Title': 'T', 'Description': 'a b', 'Content': content}),
+            '<html><title>T</title><meta content="a b"><main><p><a href=/x>x</a></p></main>',
+        )
+
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_get_reuses_and_reloads(self):
+        path = os.path.join(self.tmp.name, 'template.html')
+        self.write(path, '{{ Title }}')
+        cache = TemplateCache()
+        first = cache.get(path)
+        self.assertIs(cache.get(path), first)
+        self.write(path, '<h1>{{ Title }}</h1>')
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(cache.get(path).render({'Title': 'x'}), '<h1>x</h1>')
+        cache.minify = True
+        self.assertTrue(cache.get(path).minify)
+
+    def test_fingerprinted_assets(self):
+        static = os.path.join(self.tmp.name, 'static')
+        self.write(os.path.join(static, 'index.css'), 'body {}')
+        path = os.path.join(self.tmp.name, 'template.html')
+        self.write(path, '<link href="/index.css"><img src=/logo.png>{{ Content }}')
+        assets = AssetFingerprints()
+        assets.process(static, os.path.join(self.tmp.name, 'public'))
+        cache = TemplateCache(assets=assets)
+        template = cache.get(path)
+        self.assertEqual(template.segments, [f'<link href="{assets.urls["/index.css"]}"><img src=/logo.png>', ''])
+        self.assertEqual(template.inputs, [os.path.join(static, 'index.css')])
+        self.write(os.path.join(static, 'index.css'), 'body { margin: 0 }')
+        assets.process(static, os.path.join(self.tmp.name, 'public'))
+        self.assertIsNot(cache.get(path), template)
+
+    def test_resolve_template(self):
+        content = os.path.join(self.tmp.name, 'content')
+        default = os.path.join(self.tmp.name, 'template.html')
+        self.write(os.path.join(content, 'blog', 'template.html'), '{{ Content }}')
+        blog_template = os.path.join(content, 'blog', 'template.html')
+        self.assertEqual(resolve_template(os.path.join(content, 'index.md'), content, default), default)
+        self.assertEqual(resolve_template(os.path.join(content, 'blog', 'post.md'), content, default), blog_template)
+        self.assertEqual(resolve_template(os.path.join(content, 'blog', 'a', 'b.md'), content, default), blog_template)
+
+
+if __name__ == '__main__':
+    unittest.main()
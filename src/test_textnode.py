@@ -5,6 +5,7 @@ from textnode import (
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
+    text_node_to_html_node,
     text_to_textnodes,
     text_type_bold,
     text_type_code,
@@ -31,6 +32,21 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode('This is a text node', 'bold')
         self.assertNotEqual(node, node2)
 
+    def test_slots(self):
+        node = TextNode('This is a text node', 'bold')
+        self.assertFalse(hasattr(node, '__dict__'))
+        with self.assertRaises(AttributeError):
+            node.extra = True
+
+    def test_image_props(self):
+        node = TextNode('a cat', text_type_image, '/cat.png')
+        props = {'/cat.png': {'width': '640', 'loading': 'lazy'}}
+        self.assertEqual(text_node_to_html_node(node).to_html(), '<img alt="a cat" src="/cat.png"></img>')
+        self.assertEqual(
+            text_node_to_html_node(node, props).to_html(),
+            '<img alt="a cat" src="/cat.png" width="640" loading="lazy"></img>',
+        )
+
     def test_node_inline_split(self):
         node = TextNode('This is text with a `code block` word', text_type_text)
         new_nodes = split_nodes_delimiter([node], '`', text_type_code)
@@ -186,6 +202,30 @@ class TestTextNode(unittest.TestCase):
         ]
         self.assertListEqual(result, expected)
 
+    def test_text_to_textnodes_matches_chained_passes(self):
+        texts = [
+            '',
+            'plain text',
+            'a****b',
+            '**bold with *stars* and `ticks`** after',
+            '*italic with `code`* and [link](/a) ![img](/b.png)',
+            '[a ![b](c) ](d) [e](f)',
+            '![a](b)[c](d)![e](f)',
+            '[unclosed [link](/x) and ![also [unclosed](/y)',
+            'line one [a\nb](c) [d](e)',
+        ]
+        for text in texts:
+            bold = split_nodes_delimiter([TextNode(text, text_type_text)], '**', text_type_bold)
+            italic = split_nodes_delimiter(bold, '*', text_type_italic)
+            code = split_nodes_delimiter(italic, '`', text_type_code)
+            expected = split_nodes_link(split_nodes_image(code))
+            self.assertListEqual(text_to_textnodes(text), expected, text)
+
+    def test_text_to_textnodes_invalid_markdown(self):
+        for text in ['**unclosed', 'an *unclosed italic', '`code with * star`', '*a **b* c**']:
+            with self.assertRaises(Exception):
+                text_to_textnodes(text)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,5 @@
 from htmlnode import LeafNode
-from inline_markdown import extract_markdown_images, extract_markdown_links
+from inline_markdown import iter_markdown_images, iter_markdown_links
 
 text_type_text = 'text'
 text_type_bold = 'bold'
@@ -8,8 +8,17 @@ text_type_code = 'code'
 text_type_link = 'link'
 text_type_image = 'image'
 
+text_type_tags = {
+    text_type_text: None,
+    text_type_bold: 'b',
+    text_type_italic: 'i',
+    text_type_code: 'code',
+}
+
 
 class TextNode:
+    __slots__ = ('text', 'text_type', 'url')
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -32,19 +41,17 @@ class TextNode:
         return f'TextNode({t}, {ty}, {u})'
 
 
-def text_node_to_html_node(text_node: TextNode):
-    if text_node.text_type == text_type_text:
-        return LeafNode(value=text_node.text)
-    if text_node.text_type == text_type_bold:
-        return LeafNode(tag='b', value=text_node.text)
-    if text_node.text_type == text_type_italic:
-        return LeafNode(tag='i', value=text_node.text)
-    if text_node.text_type == text_type_code:
-        return LeafNode(tag='code', value=text_node.text)
-    if text_node.text_type == text_type_link:
-        return LeafNode(tag='a', value=text_node.text, props={'href': text_node.url})
-    if text_node.text_type == text_type_image:
-        return LeafNode(tag='img', value='', props={'alt': text_node.text, 'src': text_node.url})
+def text_node_to_html_node(text_node: TextNode, image_props=None):
+    text_type = text_node.text_type
+    if text_type in text_type_tags:
+        return LeafNode(text_type_tags[text_type], text_node.text)
+    if text_type == text_type_link:
+        return LeafNode('a', text_node.text, {'href': text_node.url})
+    if text_type == text_type_image:
+        props = {'alt': text_node.text, 'src': text_node.url}
+        if image_props and text_node.url in image_props:
+            props.update(image_props[text_node.url])
+        return LeafNode('img', '', props)
     raise Exception('Invalid text type')
 
 
@@ -73,61 +80,96 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 def split_nodes_image(old_nodes):
-    new = []
-    for node in old_nodes:
-        if node.text_type != text_type_text:
-            new.append(node)
-            continue
-        images = extract_markdown_images(node.text)
-        if not len(images):
-            new.append(node)
-            continue
-        to_split = node.text
-        splitted_nodes = []
-        for i in images:
-            splitted = to_split.split(f'![{i[0]}]({i[1]})', 1)
-            if splitted[0]:
-                splitted_nodes.append(TextNode(splitted[0], text_type_text))
-            splitted_nodes.append(TextNode(i[0], text_type_image, i[1]))
+    return _split_nodes_spans(old_nodes, iter_markdown_images, text_type_image)
 
-            to_split = splitted[1]
 
-        if to_split:
-            splitted_nodes.append(TextNode(to_split, text_type_text))
-        new.extend(splitted_nodes)
-
-    return new
+def split_nodes_link(old_nodes):
+    return _split_nodes_spans(old_nodes, iter_markdown_links, text_type_link)
 
 
-def split_nodes_link(old_nodes):
+def _split_nodes_spans(old_nodes, iter_spans, text_type):
     new = []
     for node in old_nodes:
         if node.text_type != text_type_text:
             new.append(node)
             continue
-        links = extract_markdown_links(node.text)
-        if not len(links):
+        pos = 0
+        for start, end, text, url in iter_spans(node.text):
+            if start > pos:
+                new.append(TextNode(node.text[pos:start], text_type_text))
+            new.append(TextNode(text, text_type, url))
+            pos = end
+        if pos == 0:
             new.append(node)
-            continue
-        to_split = node.text
-        splitted_nodes = []
-        for i in links:
-            splitted = to_split.split(f'[{i[0]}]({i[1]})', 1)
-            if splitted[0]:
-                splitted_nodes.append(TextNode(splitted[0], text_type_text))
-            splitted_nodes.append(TextNode(i[0], text_type_link, i[1]))
-
-            to_split = splitted[1]
-
-        if to_split:
-            splitted_nodes.append(TextNode(to_split, text_type_text))
-        new.extend(splitted_nodes)
+        elif pos < len(node.text):
+            new.append(TextNode(node.text[pos:], text_type_text))
     return new
 
 
 def text_to_textnodes(text):
-    bold = split_nodes_delimiter([TextNode(text, text_type_text)], '**', text_type_bold)
-    italic = split_nodes_delimiter(bold, '*', text_type_italic)
-    code = split_nodes_delimiter(italic, '`', text_type_code)
-    image = split_nodes_image(code)
-    return split_nodes_link(image)
+    # Single left-to-right scan equivalent to running split_nodes_delimiter for
+    # '**', '*' and '`' followed by split_nodes_image and split_nodes_link: each
+    # delimiter only pairs up inside the span left by the higher priority ones.
+    nodes = []
+    end = len(text)
+    pos = 0
+    bold = star = tick = -1
+    while pos < end:
+        if bold < pos:
+            bold = _find(text, '**', pos, end)
+        if star < pos:
+            star = _find(text, '*', pos, end)
+        if tick < pos:
+            tick = _find(text, '`', pos, end)
+
+        stop = min(bold, star, tick)
+        if stop > pos:
+            _split_images_and_links(text, pos, stop, nodes)
+        if stop == end:
+            break
+
+        if stop == bold:
+            close = _find(text, '**', bold + 2, end)
+            if close == end:
+                raise Exception('Invalid markdown.')
+            if close > bold + 2:
+                nodes.append(TextNode(text[bold + 2 : close], text_type_bold))
+            pos = close + 2
+        elif stop == star:
+            close = _find(text, '*', star + 1, end)
+            if close >= bold:
+                raise Exception('Invalid markdown.')
+            if close > star + 1:
+                nodes.append(TextNode(text[star + 1 : close], text_type_italic))
+            pos = close + 1
+        else:
+            close = _find(text, '`', tick + 1, end)
+            if close >= star:
+                raise Exception('Invalid markdown.')
+            if close > tick + 1:
+                nodes.append(TextNode(text[tick + 1 : close], text_type_code))
+            pos = close + 1
+    return nodes
+
+
+def _find(text, sub, pos, end):
+    index = text.find(sub, pos)
+    return end if index == -1 else index
+
+
+def _split_images_and_links(text, pos, end, nodes):
+    for start, stop, alt, url in iter_markdown_images(text, pos, end):
+        _split_links(text, pos, start, nodes)
+        nodes.append(TextNode(alt, text_type_image, url))
+        pos = stop
+    _split_links(text, pos, end, nodes)
+
+
+def _split_links(text, pos, end, nodes):
+    for start, stop, alt, url in iter_markdown_links(text, pos, end):
+        if start > pos:
+            nodes.append(TextNode(text[pos:start], text_type_text))
+        nodes.append(TextNode(alt, text_type_link, url))
+        pos = stop
+    if end > pos:
+        nodes.append(TextNode(text[pos:end], text_type_text))